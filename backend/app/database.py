@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -7,28 +7,73 @@ import os
 DATABASE_URL_SIMULATION = os.environ["DATABASE_URL_SIMULATION"]
 DATABASE_URL_PRODUCTION = os.environ["DATABASE_URL_PRODUCTION"]
 
+# Connection pool sizing (per engine, per worker process)
+# Keep pool_size + max_overflow at or above the threadpool size (40 by default)
+# that sync routes such as /data run on, so requests never queue for a connection
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers run alongside the bulk writers; NORMAL sync is safe with WAL"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+def _create_engine(url: str):
+    """Create an engine with pooling tuned for the ingestion endpoints"""
+    if url.startswith("sqlite"):
+        # Local/test databases: SQLAlchemy's default SQLite pool, plus write-friendly pragmas
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        return engine
+    
+    return create_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=DB_POOL_RECYCLE,
+        # LIFO reuses the most recently returned connections, keeping a small hot set
+        # and letting idle overflow connections age out
+        pool_use_lifo=True,
+        # Shows up in pg_stat_activity
+        connect_args={"application_name": "optiflow-backend"}
+    )
+
 # Create engines for both databases
-engine_simulation = create_engine(DATABASE_URL_SIMULATION)
-engine_production = create_engine(DATABASE_URL_PRODUCTION)
+engine_simulation = _create_engine(DATABASE_URL_SIMULATION)
+engine_production = _create_engine(DATABASE_URL_PRODUCTION)
 
 # Create session makers for both databases
-SessionLocal_simulation = sessionmaker(autocommit=False, autoflush=False, bind=engine_simulation)
-SessionLocal_production = sessionmaker(autocommit=False, autoflush=False, bind=engine_production)
+# Sessions are request-scoped, so objects are not expired on commit: reading them
+# afterwards (responses, broadcasts) must not trigger a reload SELECT per object
+SessionLocal_simulation = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine_simulation)
+SessionLocal_production = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine_production)
 
 Base = declarative_base()
 
+def new_session(mode=None):
+    """
+    Create a session for `mode` (default: the current mode).
+    The caller is responsible for closing it (used by streaming responses and
+    background tasks, which outlive the request dependencies).
+    """
+    from .config import config_state, ConfigMode
+    
+    if mode is None:
+        mode = config_state.mode
+    if mode == ConfigMode.SIMULATION:
+        return SessionLocal_simulation()
+    return SessionLocal_production()
+
 def get_db():
     """
     Dependency for FastAPI routes to get DB session based on current mode
     This is the main function routes should use
     """
-    from .config import config_state, ConfigMode
-    
-    if config_state.mode == ConfigMode.SIMULATION:
-        db = SessionLocal_simulation()
-    else:
-        db = SessionLocal_production()
-    
+    db = new_session()
     try:
         yield db
     finally:
@@ -4,12 +4,14 @@ Main application entry point with FastAPI
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from .database import init_db, SessionLocal_simulation, SessionLocal_production
 from .models import Configuration, InventoryItem, Product
 from .config import config_state, ConfigMode
 from .core import logger
 from .utils.epc_lookup import epc_lookup
+from .websocket_manager import manager as ws_manager
 import random
 
 
@@ -106,6 +108,7 @@ from .routers import (
 app = FastAPI(
     title="OptiFlow API",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     description="""
 # OptiFlow Real-Time Inventory Tracking System
 
@@ -216,3 +219,13 @@ def startup_event():
         db_production.close()
     
     logger.info("Both databases initialized successfully")
+
+@app.on_event("startup")
+async def start_broadcast_worker():
+    """Start the background WebSocket broadcast worker"""
+    ws_manager.start()
+
+@app.on_event("shutdown")
+async def stop_broadcast_worker():
+    """Stop the background WebSocket broadcast worker"""
+    await ws_manager.stop()
@@ -1,14 +1,18 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Numeric, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Numeric, Text, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
 
 class Detection(Base):
     __tablename__ = "detections"
+    # Per-tag history lookups, newest first (also serves plain product_id lookups)
+    __table_args__ = (
+        Index("idx_detections_product_timestamp", "product_id", text("timestamp DESC")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, default=datetime.utcnow, index=True)
-    product_id = Column(String, index=True)
+    product_id = Column(String)
     product_name = Column(String)
     x_position = Column(Float, nullable=True)  # Item location
     y_position = Column(Float, nullable=True)
@@ -27,10 +31,14 @@ class Detection(Base):
 
 class UWBMeasurement(Base):
     __tablename__ = "uwb_measurements"
+    # Latest measurement per anchor (also serves plain mac_address lookups)
+    __table_args__ = (
+        Index("idx_uwb_measurements_mac_timestamp", "mac_address", text("timestamp DESC")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, default=datetime.utcnow, index=True)
-    mac_address = Column(String, index=True)
+    mac_address = Column(String)
     distance_cm = Column(Float)
     status = Column(String, nullable=True)
     
@@ -147,6 +155,22 @@ class InventoryItem(Base):
     last_detection_rssi = Column(Float, nullable=True)  # Last RSSI signal strength when detected (negative dBm)
     first_miss_at = Column(DateTime, nullable=True)  # Timestamp when consecutive misses started
     
+    # Partial indexes backing the live map (/data/items) and missing sidebar (/data/missing),
+    # plus (product_id, status) for the per-product stock counts
+    __table_args__ = (
+        Index("idx_inventory_items_product_status", "product_id", "status"),
+        Index(
+            "idx_inventory_items_positioned", "id",
+            postgresql_where=text("x_position IS NOT NULL AND y_position IS NOT NULL"),
+            sqlite_where=text("x_position IS NOT NULL AND y_position IS NOT NULL"),
+        ),
+        Index(
+            "idx_inventory_items_missing", "last_seen_at",
+            postgresql_where=text("status = 'not present' AND last_seen_at IS NOT NULL"),
+            sqlite_where=text("status = 'not present' AND last_seen_at IS NOT NULL"),
+        ),
+    )
+    
     # Relationships
     product = relationship("Product", back_populates="inventory_items")
     purchase_event = relationship("PurchaseEvent", back_populates="inventory_item", uselist=False)
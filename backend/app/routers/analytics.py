@@ -67,8 +67,20 @@ def get_stock_heatmap(db: Session = Depends(get_db)):
     - 100% (red) = all items of this product are missing
     - Gradient for partial depletion (e.g., 50% = half missing)
     """
-    # Get all items that have positions
-    items = db.query(InventoryItem).filter(
+    # Get all items that have positions, with just the columns the heatmap needs
+    # (product name/category joined in, rather than looked up per product)
+    items = db.query(
+        InventoryItem.id,
+        InventoryItem.product_id,
+        InventoryItem.rfid_tag,
+        InventoryItem.x_position,
+        InventoryItem.y_position,
+        InventoryItem.status,
+        Product.name.label("product_name"),
+        Product.category.label("product_category")
+    ).join(
+        Product, Product.id == InventoryItem.product_id
+    ).filter(
         InventoryItem.x_position.isnot(None),
         InventoryItem.y_position.isnot(None)
     ).all()
@@ -90,10 +102,6 @@ def get_stock_heatmap(db: Session = Depends(get_db)):
     # Calculate depletion for each item based on product stats
     result = []
     for product_id, stats in product_stats.items():
-        product = db.query(Product).filter(Product.id == product_id).first()
-        if not product:
-            continue
-        
         # Calculate depletion: (missing items / total items) * 100
         missing = stats['total'] - stats['present']
         depletion_percentage = (missing / stats['total'] * 100) if stats['total'] > 0 else 0.0
@@ -102,8 +110,8 @@ def get_stock_heatmap(db: Session = Depends(get_db)):
         for item in stats['items']:
             result.append({
                 "product_id": item.product_id,
-                "product_name": product.name,
-                "product_category": product.category,
+                "product_name": item.product_name,
+                "product_category": item.product_category,
                 "item_id": item.id,
                 "rfid_tag": item.rfid_tag,
                 "x": item.x_position,
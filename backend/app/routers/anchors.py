@@ -1,5 +1,6 @@
 """Anchor management router"""
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import exists, select
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import List
@@ -8,6 +9,7 @@ from ..database import get_db
 from ..models import Anchor
 from ..schemas import AnchorCreate, AnchorUpdate, AnchorResponse
 from ..core import logger
+from ..services.anchor_cache import anchor_cache
 
 router = APIRouter(prefix="/anchors", tags=["anchors"])
 
@@ -30,7 +32,7 @@ def get_anchors(db: Session = Depends(get_db)):
 @router.post("", response_model=AnchorResponse, status_code=201)
 def create_anchor(anchor: AnchorCreate, db: Session = Depends(get_db)):
     """Create a new anchor configuration"""
-    existing = db.query(Anchor).filter(Anchor.mac_address == anchor.mac_address).first()
+    existing = db.scalar(select(exists().where(Anchor.mac_address == anchor.mac_address)))
     if existing:
         raise HTTPException(status_code=400, detail=f"Anchor with MAC {anchor.mac_address} already exists")
     
@@ -43,7 +45,7 @@ def create_anchor(anchor: AnchorCreate, db: Session = Depends(get_db)):
     )
     db.add(new_anchor)
     db.commit()
-    db.refresh(new_anchor)
+    anchor_cache.invalidate()
     
     logger.info(f"Created anchor {new_anchor.id}: {new_anchor.name} at ({new_anchor.x_position}, {new_anchor.y_position})")
     
@@ -61,7 +63,7 @@ def create_anchor(anchor: AnchorCreate, db: Session = Depends(get_db)):
 @router.put("/{anchor_id}", response_model=AnchorResponse)
 def update_anchor(anchor_id: int, anchor_update: AnchorUpdate, db: Session = Depends(get_db)):
     """Update an existing anchor configuration"""
-    anchor = db.query(Anchor).filter(Anchor.id == anchor_id).first()
+    anchor = db.get(Anchor, anchor_id)
     if not anchor:
         raise HTTPException(status_code=404, detail=f"Anchor {anchor_id} not found")
     
@@ -76,7 +78,7 @@ def update_anchor(anchor_id: int, anchor_update: AnchorUpdate, db: Session = Dep
     
     anchor.updated_at = datetime.utcnow()
     db.commit()
-    db.refresh(anchor)
+    anchor_cache.invalidate()
     
     logger.info(f"Updated anchor {anchor.id}: {anchor.name}")
     
@@ -94,11 +96,12 @@ def update_anchor(anchor_id: int, anchor_update: AnchorUpdate, db: Session = Dep
 @router.delete("/{anchor_id}", status_code=204)
 def delete_anchor(anchor_id: int, db: Session = Depends(get_db)):
     """Delete an anchor configuration"""
-    anchor = db.query(Anchor).filter(Anchor.id == anchor_id).first()
+    anchor = db.get(Anchor, anchor_id)
     if not anchor:
         raise HTTPException(status_code=404, detail=f"Anchor {anchor_id} not found")
     
     logger.info(f"Deleting anchor {anchor.id}: {anchor.name}")
     db.delete(anchor)
     db.commit()
+    anchor_cache.invalidate()
     return None
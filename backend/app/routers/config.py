@@ -141,7 +141,6 @@ def update_store_config(
         config_state.max_display_items = update.max_display_items
     
     db.commit()
-    db.refresh(db_config)
     
     logger.info(f"Updated store config: {db_config.store_width}x{db_config.store_height}cm, max_display_items={config_state.max_display_items}")
     
@@ -1,99 +1,223 @@
 """Data ingestion and retrieval router"""
+import logging
 import math
-import json
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+import os
+import numpy as np
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
+from sqlalchemy import (
+    func, case, text, select, update, values, table, column, bindparam, literal, null, cast, union, union_all,
+    String, Float, DateTime, BigInteger
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, aliased
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import List, Dict
 
-from ..database import get_db
+from ..database import get_db, new_session
 from ..models import (
-    Detection, UWBMeasurement, TagPosition, Anchor,
+    Detection, UWBMeasurement, TagPosition,
     InventoryItem, Product, PurchaseEvent, ProductLocationHistory, StockLevel
 )
 from ..schemas import (
-    DataPacket, DetectionResponse, UWBMeasurementResponse, LatestDataResponse
+    DataPacket, DetectionResponse, LatestDataResponse,
+    BulkDetectionPacket, BulkUWBPacket
 )
 from ..triangulation import TriangulationService
 from ..config import config_state, ConfigMode
 from ..core import logger
 from ..websocket_manager import manager as ws_manager
 from ..services.missing_detection import MissingItemDetector
+from ..services.anchor_cache import anchor_cache, AnchorSet
 from ..utils.epc_lookup import epc_lookup
+from ..utils.streaming import stream_json_array
+from ..utils.bulk_insert import insert_rows
 
 router = APIRouter(tags=["data"])
 
+# Keep-alive reply, encoded once
+PONG = orjson.dumps({"type": "pong"})
+
+# Rows per insert/flush in the bulk ingestion endpoints (bounds session memory)
+BULK_INSERT_CHUNK_SIZE = int(os.getenv("BULK_INSERT_CHUNK_SIZE", "1000"))
+
+@lru_cache(maxsize=256)
+def _triangulate_cached(anchor_xy: tuple, distances: tuple):
+    """
+    Triangulate from flat (x1, y1, x2, y2, ...) anchor coordinates and distances.
+    Keys come from _triangulate (anchor-ordered, rounded), so a stationary
+    employee's repeated readings skip the solve. The key holds the anchor
+    coordinates themselves, so moving an anchor can never return a stale position.
+    """
+    return TriangulationService.calculate_position_arrays(
+        np.array(anchor_xy, dtype=np.float64).reshape(-1, 2),
+        np.array(distances, dtype=np.float64)
+    )
+
+def _triangulate(anchors: AnchorSet, matched: List[int], distances: List[float]):
+    """Triangulate matched anchors (rows of anchors.positions) through the cache"""
+    # Sorted by anchor so the reference anchor doesn't depend on packet order, and
+    # rounded to 0.1 cm (well below UWB ranging noise) so float jitter shares a key
+    pairs = sorted(zip(matched, distances))
+    order = [i for i, _ in pairs]
+    return _triangulate_cached(
+        tuple(anchors.positions[order].ravel().tolist()),
+        tuple(round(distance, 1) for _, distance in pairs)
+    )
+
+def _utcnow() -> datetime:
+    """Current UTC time, naive like the timestamp columns (replaces deprecated utcnow())"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _chunked(rows: list, size: int):
+    """Yield consecutive slices of `rows` with at most `size` elements"""
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+def _async_commit(db: Session) -> None:
+    """
+    Let PostgreSQL acknowledge this transaction's COMMIT before its WAL is flushed.
+    Only used for simulation telemetry: a crash can lose the last few hundred ms
+    of batches, but never corrupts data, and the next batch overwrites item state.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SET LOCAL synchronous_commit = OFF"))
+
+def _json_body(model):
+    """
+    Dependency that validates the raw request body straight into `model`.
+    pydantic-core parses the JSON bytes in one pass, without the intermediate
+    dict FastAPI builds for a declared body parameter.
+    """
+    async def parse(request: Request):
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as e:
+            # Same error shape FastAPI produces for a declared body parameter
+            raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors()])
+    return parse
+
+def _json_body_openapi(model) -> dict:
+    """
+    openapi_extra documenting `model` as the JSON request body of a route that
+    reads it through _json_body (FastAPI can't infer a body from a dependency).
+    Nested models are inlined, as their $defs refs don't resolve inside the spec.
+    """
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+    
+    def inline(node):
+        if isinstance(node, list):
+            return [inline(value) for value in node]
+        if not isinstance(node, dict):
+            return node
+        resolved = {key: inline(value) for key, value in node.items() if key != "$ref"}
+        if "$ref" in node:
+            resolved = {**inline(defs[node["$ref"].rsplit("/", 1)[-1]]), **resolved}
+        return resolved
+    
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": inline(schema)}}}}
+
 @router.websocket("/ws/live")
 async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket endpoint for real-time data streaming.
     Clients connect here to receive live position and detection updates.
     """
-    logger.info(f"WebSocket connection attempt from {websocket.client}")
+    logger.info("WebSocket connection attempt from %s", websocket.client)
     await ws_manager.connect(websocket)
-    logger.info(f"WebSocket connected successfully from {websocket.client}")
+    logger.info("WebSocket connected successfully from %s", websocket.client)
     try:
-        # Keep connection alive and handle incoming messages if needed
+        # Liveness is handled by protocol-level ping frames (uvicorn --ws-ping-interval);
+        # application-level pings from older clients still get a pre-encoded pong
         while True:
-            # Wait for any client messages (ping/pong, etc.)
             data = await websocket.receive_text()
-            logger.debug(f"WebSocket received: {data}")
-            # Echo back for keep-alive
-            await websocket.send_text(json.dumps({"type": "pong"}))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("WebSocket received: %s", data)
+            await websocket.send_bytes(PONG)
     except WebSocketDisconnect:
-        logger.info(f"WebSocket disconnected from {websocket.client}")
+        logger.info("WebSocket disconnected from %s", websocket.client)
         ws_manager.disconnect(websocket)
     except Exception as e:
-        logger.error(f"WebSocket error: {e}")
+        logger.error("WebSocket error: %s", e)
         ws_manager.disconnect(websocket)
 
-@router.post("/data", status_code=201)
-async def receive_data(packet: DataPacket, db: Session = Depends(get_db)):
+def _insert_ignoring_conflicts(db: Session, model):
+    """Dialect INSERT construct that supports ON CONFLICT DO NOTHING (PostgreSQL or SQLite)"""
+    if db.get_bind().dialect.name == "postgresql":
+        return pg_insert(model)
+    return sqlite_insert(model)
+
+def _load_items_by_tag(db: Session, rfid_tags) -> Dict[str, InventoryItem]:
+    """Load the inventory items for `rfid_tags` with one IN query per chunk, keyed by tag"""
+    tags = list(rfid_tags)
+    items_by_tag: Dict[str, InventoryItem] = {}
+    for chunk in _chunked(tags, BULK_INSERT_CHUNK_SIZE):
+        for item in db.query(InventoryItem).filter(InventoryItem.rfid_tag.in_(chunk)):
+            items_by_tag[item.rfid_tag] = item
+    return items_by_tag
+
+@router.post("/data", status_code=201, openapi_extra=_json_body_openapi(DataPacket))
+def receive_data(packet: DataPacket = Depends(_json_body(DataPacket)), db: Session = Depends(get_db)):
     """
     Receive combined RFID detections and UWB measurements from devices
     Automatically calculates position if 2+ anchors available
     Broadcasts updates to WebSocket clients in real-time
     
+    A sync handler on purpose: FastAPI runs it in the threadpool, so its blocking
+    database work never stalls the event loop (WebSockets, broadcast worker).
+    
     NOTE: This endpoint accepts data from BOTH simulation and production hardware,
     but the mqtt_bridge filters messages based on current mode to prevent overlap.
     Additional validation here ensures data integrity.
     """
     try:
+        # Read the mode once: the detection loops and missing-item inference below
+        # all use this value, so one packet is handled under one mode
+        mode = config_state.mode
+        is_production = mode is ConfigMode.PRODUCTION
+        
         # Log incoming data source for debugging
-        logger.info(f"Received data packet: {len(packet.detections)} detections, {len(packet.uwb_measurements)} UWB measurements (Mode: {config_state.mode.value})")
+        logger.info("Received data packet: %d detections, %d UWB measurements (Mode: %s)",
+                    len(packet.detections), len(packet.uwb_measurements), mode.value)
         
         timestamp = datetime.fromisoformat(packet.timestamp.replace('Z', '+00:00'))
-        detection_ids = []
-        uwb_ids = []
         position_calculated = False
+        # Inventory items touched by this packet, reused for position updates and broadcasts
+        items_by_tag: Dict[str, InventoryItem] = {}
+        # Existing inventory items for every tag in the packet, loaded up front
+        known_items = _load_items_by_tag(db, {d.product_id for d in packet.detections})
+        # Product IDs looked up or created for new tags in this packet (PRODUCTION only)
+        product_ids_by_sku: Dict[str, int] = {}
         
         # Store RFID detections
         # NOTE: Items in the detections list are implicitly "present" (detected by RFID)
         # The missing detection service will infer which items are missing based on
         # what's NOT in this list
+        # Detection rows are never read back - insert them all in one statement
+        insert_rows(db, Detection, [{
+            "timestamp": timestamp,
+            "product_id": detection.product_id,
+            "product_name": detection.product_name,
+            "x_position": detection.x_position,
+            "y_position": detection.y_position,
+            "status": 'present'  # Detected items are present
+        } for detection in packet.detections])
+        
         for detection in packet.detections:
-            det = Detection(
-                timestamp=timestamp,
-                product_id=detection.product_id,
-                product_name=detection.product_name,
-                x_position=detection.x_position,
-                y_position=detection.y_position,
-                status='present'  # Detected items are present
-            )
-            db.add(det)
-            db.flush()
-            detection_ids.append(det.id)
-            
             # Sync to inventory_items table for analytics
-            inventory_item = db.query(InventoryItem).filter(
-                InventoryItem.rfid_tag == detection.product_id
-            ).first()
+            inventory_item = known_items.get(detection.product_id)
             
             if not inventory_item:
                 # RFID tag not found in inventory
                 # In PRODUCTION mode: Auto-create the item (for demo/real hardware)
                 # In SIMULATION mode: Skip (simulation should have pre-generated inventory)
-                if config_state.mode == ConfigMode.PRODUCTION:
+                if is_production:
                     # Auto-create a product and inventory item for this new tag
                     # Look up product metadata from epc_translation.csv
                     # NOTE: At scale, this would be replaced by API calls to Decathlon's product database
@@ -102,101 +226,128 @@ async def receive_data(packet: DataPacket, db: Session = Depends(get_db)):
                     if metadata:
                         # Use metadata from CSV
                         product_sku = metadata.gtin  # Use GTIN as SKU
-                        product_name = epc_lookup.get_product_name(detection.product_id, include_details=False)
+                        product_name = metadata.name
                         product_category = metadata.category
                         product_size = metadata.size
                         product_color = metadata.color
                         product_price = metadata.price_chf
-                        logger.info(f"[PRODUCTION] Found metadata for EPC {detection.product_id}: {product_name}")
+                        logger.info("[PRODUCTION] Found metadata for EPC %s: %s", detection.product_id, product_name)
                     else:
                         # Skip items that can't be translated (demo items)
-                        logger.warning(f"[PRODUCTION] No metadata found for EPC {detection.product_id} - skipping demo item")
+                        logger.warning("[PRODUCTION] No metadata found for EPC %s - skipping demo item", detection.product_id)
                         continue  # Skip this detection, don't create demo items
                     
                     # Check if product already exists (by SKU)
-                    product = db.query(Product).filter(Product.sku == product_sku).first()
-                    if not product:
-                        product = Product(
-                            sku=product_sku,
-                            name=product_name,
-                            category=product_category,
-                            size=product_size,
-                            color=product_color,
-                            unit_price=product_price
-                        )
-                        db.add(product)
-                        db.flush()
-                        logger.info(f"[PRODUCTION] Created new product: {product.name} (SKU: {product_sku}) - CHF {product_price}")
-                    
-                    # Create the inventory item with full display name (includes size/color)
-                    display_name = epc_lookup.get_product_name(detection.product_id, include_details=True) if metadata else product_name
+                    # Only the ID is needed, so no Product entity is loaded for existing products
+                    product_id = product_ids_by_sku.get(product_sku)
+                    if product_id is None:
+                        product_id = db.execute(
+                            select(Product.id).where(Product.sku == product_sku).limit(1)
+                        ).scalar()
+                    if product_id is None:
+                        # ON CONFLICT: a concurrent packet may create the same product first
+                        product_id = db.execute(
+                            _insert_ignoring_conflicts(db, Product)
+                            .values(
+                                sku=product_sku,
+                                name=product_name,
+                                category=product_category,
+                                size=product_size,
+                                color=product_color,
+                                unit_price=product_price
+                            )
+                            .on_conflict_do_nothing(index_elements=["sku"])
+                            .returning(Product.id)
+                        ).scalar()
+                        if product_id is not None:
+                            logger.info("[PRODUCTION] Created new product: %s (SKU: %s) - CHF %s", product_name, product_sku, product_price)
+                        else:
+                            product_id = db.execute(
+                                select(Product.id).where(Product.sku == product_sku)
+                            ).scalar_one()
+                    product_ids_by_sku[product_sku] = product_id
                     
-                    inventory_item = InventoryItem(
-                        rfid_tag=detection.product_id,
-                        product_id=product.id,
-                        status='present',
-                        # Position will be set below when we have employee location
-                        x_position=None,
-                        y_position=None,
-                        last_seen_at=timestamp,
-                        consecutive_misses=0,
-                        first_miss_at=None
-                    )
-                    db.add(inventory_item)
-                    db.flush()
-                    logger.info(f"[PRODUCTION] Created inventory item: {display_name} (RFID: {detection.product_id})")
+                    # Create the inventory item (one INSERT ... RETURNING, loaded straight into the session)
+                    inventory_item = db.scalars(
+                        _insert_ignoring_conflicts(db, InventoryItem)
+                        .values(
+                            rfid_tag=detection.product_id,
+                            product_id=product_id,
+                            status='present',
+                            # Position will be set below when we have employee location
+                            x_position=None,
+                            y_position=None,
+                            last_seen_at=timestamp,
+                            consecutive_misses=0,
+                            first_miss_at=None
+                        )
+                        .on_conflict_do_nothing(index_elements=["rfid_tag"])
+                        .returning(InventoryItem)
+                    ).first()
+                    if inventory_item is not None:
+                        # Log with full display name (includes size/color)
+                        logger.info("[PRODUCTION] Created inventory item: %s (RFID: %s)", metadata.display_name, detection.product_id)
+                    else:
+                        # A concurrent packet created it first - treat it as an existing item
+                        inventory_item = db.query(InventoryItem)\
+                            .filter(InventoryItem.rfid_tag == detection.product_id)\
+                            .one()
+                        inventory_item.last_seen_at = timestamp
+                    known_items[detection.product_id] = inventory_item
                 else:
                     # SIMULATION mode - skip unknown tags
-                    logger.warning(f"Unknown RFID tag detected: {detection.product_id} - skipping (not in inventory)")
+                    logger.warning("Unknown RFID tag detected: %s - skipping (not in inventory)", detection.product_id)
                     continue  # Skip this detection, don't create it
             # Existing items: Update last_seen_at when detected
             else:
                 inventory_item.last_seen_at = timestamp
                 # Position will be updated by triangulation below if available
+            
+            items_by_tag[detection.product_id] = inventory_item
         
         # Store UWB measurements
-        for uwb in packet.uwb_measurements:
-            measurement = UWBMeasurement(
-                timestamp=timestamp,
-                mac_address=uwb.mac_address,
-                distance_cm=uwb.distance_cm,
-                status=uwb.status
-            )
-            db.add(measurement)
-            db.flush()
-            uwb_ids.append(measurement.id)
-        
-        db.commit()
+        insert_rows(db, UWBMeasurement, [{
+            "timestamp": timestamp,
+            "mac_address": uwb.mac_address,
+            "distance_cm": uwb.distance_cm,
+            "status": uwb.status
+        } for uwb in packet.uwb_measurements])
         
-        # Try to calculate position if we have enough data
+        # The whole packet is committed once at the end. Position calculation and
+        # missing detection run inside a savepoint so a failure there only discards
+        # their own changes, never the stored detections/measurements.
         calculated_x = None
         calculated_y = None
+        position_update = None
+        updated_items = []
+        missing_data = None
         
+        savepoint = db.begin_nested()
         try:
-            anchors = db.query(Anchor).filter(Anchor.is_active == True).all()
-            logger.info(f"Position calculation: {len(anchors)} anchors configured, {len(packet.uwb_measurements)} UWB measurements received")
+            anchors = anchor_cache.get(db)
+            logger.info("Position calculation: %d anchors configured, %d UWB measurements received",
+                        len(anchors), len(packet.uwb_measurements))
             
             if len(anchors) >= 2 and len(packet.uwb_measurements) >= 2:
-                measurements = []
-                configured_macs = {a.mac_address for a in anchors}
-                received_macs = {uwb.mac_address for uwb in packet.uwb_measurements}
-                logger.info(f"Configured anchor MACs: {configured_macs}")
-                logger.info(f"Received UWB MACs: {received_macs}")
+                # Structure-of-arrays inputs: matched anchor indices and their distances
+                matched = []
+                distances = []
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Configured anchor MACs: %s", set(anchors.index_by_mac))
+                    logger.debug("Received UWB MACs: %s", set(uwb.mac_address for uwb in packet.uwb_measurements))
                 
                 for uwb in packet.uwb_measurements:
-                    anchor = next((a for a in anchors if a.mac_address == uwb.mac_address), None)
-                    if anchor:
-                        measurements.append((
-                            anchor.x_position,
-                            anchor.y_position,
-                            uwb.distance_cm
-                        ))
-                        logger.info(f"Matched anchor {uwb.mac_address} at ({anchor.x_position}, {anchor.y_position})")
+                    i = anchors.index_by_mac.get(uwb.mac_address)
+                    if i is not None:
+                        matched.append(i)
+                        distances.append(uwb.distance_cm)
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Matched anchor %s at (%s, %s)", uwb.mac_address, *anchors.positions[i])
                     else:
-                        logger.warning(f"No anchor configured for MAC: {uwb.mac_address}")
+                        logger.warning("No anchor configured for MAC: %s", uwb.mac_address)
                 
-                if len(measurements) >= 2:
-                    result = TriangulationService.calculate_position(measurements)
+                if len(matched) >= 2:
+                    result = _triangulate(anchors, matched, distances)
                     if result:
                         x, y, confidence = result
                         
@@ -207,11 +358,11 @@ async def receive_data(packet: DataPacket, db: Session = Depends(get_db)):
                             x_position=x,
                             y_position=y,
                             confidence=confidence,
-                            num_anchors=len(measurements)
+                            num_anchors=len(matched)
                         )
                         db.add(position)
                         position_calculated = True
-                        logger.info(f"✅ Employee position calculated: ({x:.1f}, {y:.1f}) confidence={confidence:.2f}")
+                        logger.info("✅ Employee position calculated: (%.1f, %.1f) confidence=%.2f", x, y, confidence)
                         
                         # Build mapping of detected tags to RSSI for the detection service
                         detected_rfid_with_rssi: Dict[str, float] = {}
@@ -221,11 +372,12 @@ async def receive_data(packet: DataPacket, db: Session = Depends(get_db)):
                                 rssi = detection.rssi_dbm if detection.rssi_dbm is not None else -50.0
                                 detected_rfid_with_rssi[detection.product_id] = rssi
                         
+                        # Items restored from missing to present by this packet (PRODUCTION only)
+                        restored_tags: List[str] = []
+                        
                         # Update detected items' positions and RSSI based on mode
                         for detection in packet.detections:
-                            inventory_item = db.query(InventoryItem).filter(
-                                InventoryItem.rfid_tag == detection.product_id
-                            ).first()
+                            inventory_item = items_by_tag.get(detection.product_id)
                             
                             if inventory_item and detection.status == 'present':
                                 rssi = detection.rssi_dbm if detection.rssi_dbm is not None else -50.0
@@ -234,10 +386,11 @@ async def receive_data(packet: DataPacket, db: Session = Depends(get_db)):
                                 # In production, if you physically place a tag back and scan it, it should become present
                                 # SIMULATION MODE: Keep missing items as missing (they need explicit restock)
                                 was_restored = False
-                                if inventory_item.status == 'not present' and config_state.mode == ConfigMode.PRODUCTION:
-                                    logger.info(f"   🔄 [PRODUCTION] Item {detection.product_id[-8:]} was MISSING, now detected - restoring to PRESENT")
+                                if inventory_item.status == 'not present' and is_production:
+                                    logger.info("   🔄 [PRODUCTION] Item %s was MISSING, now detected - restoring to PRESENT", detection.product_id[-8:])
                                     inventory_item.status = 'present'
                                     was_restored = True
+                                    restored_tags.append(inventory_item.rfid_tag)
                                 
                                 # Update items that are 'present' or were just restored
                                 if inventory_item.status == 'present':
@@ -254,24 +407,23 @@ async def receive_data(packet: DataPacket, db: Session = Depends(get_db)):
                                     
                                     # PRODUCTION MODE: Set position to where employee detected it
                                     # (real hardware - item found at employee's location)
-                                    if config_state.mode == ConfigMode.PRODUCTION:
+                                    if is_production:
                                         inventory_item.x_position = x
                                         inventory_item.y_position = y
                                         if was_restored:
-                                            logger.info(f"   ✅ [PRODUCTION] Item {detection.product_id[-8:]} restored at position ({x:.1f}, {y:.1f}), RSSI={rssi}")
+                                            logger.info("   ✅ [PRODUCTION] Item %s restored at position (%.1f, %.1f), RSSI=%s", detection.product_id[-8:], x, y, rssi)
                                         else:
-                                            logger.debug(f"   [PRODUCTION] Updated item {detection.product_id[-8:]} to employee position ({x:.1f}, {y:.1f}), RSSI={rssi}")
+                                            logger.debug("   [PRODUCTION] Updated item %s to employee position (%.1f, %.1f), RSSI=%s",
+                                                         detection.product_id[-8:], x, y, rssi)
                                     elif inventory_item.x_position is None:
                                         # SIMULATION: Only set position if item has none (shouldn't happen if inventory was generated properly)
                                         inventory_item.x_position = x
                                         inventory_item.y_position = y
-                                        logger.warning(f"   [SIMULATION] Item {detection.product_id} had no position, set to ({x:.1f}, {y:.1f})")
+                                        logger.warning("   [SIMULATION] Item %s had no position, set to (%.1f, %.1f)", detection.product_id, x, y)
                                     # else: SIMULATION mode and item has position - keep the shelf position!
                                 # else: Item is 'not present' in SIMULATION mode - don't change anything
                                 # Simulation missing items can only be restored via explicit restock action
                         
-                        db.commit()
-                        position_calculated = True
                         
                         # === UNIFIED MISSING ITEM DETECTION ===
                         # Uses the SAME MissingItemDetector algorithm for BOTH simulation and production
@@ -285,92 +437,96 @@ async def receive_data(packet: DataPacket, db: Session = Depends(get_db)):
                         # The consecutive miss threshold accounts for RFID read failures
                         # No time-based check needed - miss count alone is sufficient
                         
-                        logger.info(f"\n{'='*60}")
-                        logger.info(f"🔍 MISSING DETECTION CHECK")
-                        logger.info(f"   Employee at: ({x:.1f}, {y:.1f})")
-                        logger.info(f"   Detected {len(detected_rfid_with_rssi)} RFID tags in packet")
+                        log_inference = logger.isEnabledFor(logging.INFO)
+                        if log_inference:
+                            logger.info("\n%s", "=" * 60)
+                            logger.info("🔍 MISSING DETECTION CHECK")
+                            logger.info("   Employee at: (%.1f, %.1f)", x, y)
+                            logger.info("   Detected %d RFID tags in packet", len(detected_rfid_with_rssi))
                         
                         newly_missing_items = MissingItemDetector.process_detections(
                             db=db,
                             detected_rfid_tags=detected_rfid_with_rssi,
                             employee_x=x,
                             employee_y=y,
-                            timestamp=timestamp
+                            timestamp=timestamp,
+                            mode=mode
                         )
                         
-                        if newly_missing_items:
-                            logger.info(f"   🧮 Total newly missing: {len(newly_missing_items)} item(s)")
-                        logger.info(f"{'='*60}\n")
+                        if log_inference:
+                            if newly_missing_items:
+                                logger.info("   🧮 Total newly missing: %d item(s)", len(newly_missing_items))
+                            logger.info("%s\n", "=" * 60)
                         
-                        # Broadcast real-time updates to WebSocket clients
-                        await ws_manager.broadcast_position_update({
+                        # Real-time updates for WebSocket clients, sent once the packet is committed
+                        position_update = {
                             "timestamp": timestamp.isoformat(),
                             "tag_id": "employee",
                             "x": x,
                             "y": y,
                             "confidence": confidence,
-                            "num_anchors": len(measurements)
-                        })
+                            "num_anchors": len(matched)
+                        }
                         
-                        # Broadcast updated items (detected + newly missing)
-                        updated_items = []
-                        for detection in packet.detections:
-                            inv_item = db.query(InventoryItem).filter(
-                                InventoryItem.rfid_tag == detection.product_id
-                            ).first()
-                            if inv_item and inv_item.x_position is not None:
-                                prod = db.query(Product).filter(Product.id == inv_item.product_id).first()
-                                updated_items.append({
-                                    "rfid_tag": inv_item.rfid_tag,
-                                    "product_name": prod.name if prod else "Unknown",
-                                    "x": inv_item.x_position,
-                                    "y": inv_item.y_position,
-                                    "status": inv_item.status
-                                })
-                        
-                        # Also include newly missing items in the broadcast
+                        # Updated items (detected + newly missing), built from the objects
+                        # already in the session - one name lookup instead of per-item queries
+                        broadcast_items = {
+                            tag: item for tag, item in items_by_tag.items()
+                            if item.x_position is not None
+                        }
                         for item in newly_missing_items:
-                            prod = db.query(Product).filter(Product.id == item.product_id).first()
-                            updated_items.append({
-                                "rfid_tag": item.rfid_tag,
-                                "product_name": prod.name if prod else "Unknown",
-                                "x": item.x_position,
-                                "y": item.y_position,
-                                "status": item.status
-                            })
-                        
-                        if updated_items:
-                            await ws_manager.broadcast_item_update(updated_items)
+                            broadcast_items[item.rfid_tag] = item
                         
-                        # Broadcast updated missing items list for the sidebar
-                        # This needs to happen when:
-                        # 1. Items are newly marked missing
-                        # 2. Items are restored from missing to present
-                        # Always broadcast the current missing list to keep UI in sync
-                        missing_items_list = db.query(InventoryItem, Product)\
-                            .join(Product, InventoryItem.product_id == Product.id)\
-                            .filter(InventoryItem.status == 'not present')\
-                            .filter(InventoryItem.last_seen_at.isnot(None))\
-                            .all()
+                        product_ids = {item.product_id for item in broadcast_items.values()}
+                        product_name_by_id = dict(
+                            db.query(Product.id, Product.name).filter(Product.id.in_(product_ids)).all()
+                        ) if product_ids else {}
                         
-                        missing_data = [{
+                        updated_items = [{
                             "rfid_tag": item.rfid_tag,
-                            "product_name": product.name,
+                            "product_name": product_name_by_id.get(item.product_id, "Unknown"),
                             "x": item.x_position,
                             "y": item.y_position,
                             "status": item.status
-                        } for item, product in missing_items_list]
-                        
-                        # Always broadcast the missing list to keep it in sync
-                        await ws_manager.broadcast_missing_update(missing_data)
+                        } for item in broadcast_items.values()]
                         
+                        # Missing-items sidebar: send only what changed in this packet
+                        # (newly missing / restored) instead of re-querying the full list
+                        if newly_missing_items or restored_tags:
+                            missing_data = {
+                                "added": [{
+                                    "rfid_tag": item.rfid_tag,
+                                    "product_name": product_name_by_id.get(item.product_id, "Unknown"),
+                                    "x": item.x_position,
+                                    "y": item.y_position,
+                                    "status": item.status
+                                } for item in newly_missing_items],
+                                "removed": restored_tags
+                            }
+            
+            savepoint.commit()
         except Exception as pos_error:
-            logger.warning(f"Position calculation failed: {pos_error}")
+            savepoint.rollback()
+            position_calculated = False
+            position_update = None
+            updated_items = []
+            missing_data = None
+            logger.warning("Position calculation failed: %s", pos_error)
+        
+        db.commit()
+        
+        # Broadcast only after the data is durable
+        if position_update is not None:
+            ws_manager.broadcast_position_update(position_update)
+        if updated_items:
+            ws_manager.broadcast_item_update(updated_items)
+        if missing_data is not None:
+            ws_manager.broadcast_missing_update(missing_data["added"], missing_data["removed"])
         
         return {
             "status": "success",
-            "detections_stored": len(detection_ids),
-            "uwb_measurements_stored": len(uwb_ids),
+            "detections_stored": len(packet.detections),
+            "uwb_measurements_stored": len(packet.uwb_measurements),
             "position_calculated": position_calculated
         }
     
@@ -381,84 +537,136 @@ async def receive_data(packet: DataPacket, db: Session = Depends(get_db)):
 @router.get("/data/latest", response_model=LatestDataResponse)
 def get_latest_data(limit: int = 50, db: Session = Depends(get_db)):
     """Get the most recent detections and UWB measurements"""
-    detections = db.query(Detection)\
-        .order_by(Detection.timestamp.desc())\
-        .limit(limit)\
-        .all()
+    # Both "latest N" lookups in one round trip: UNION ALL over a shared column layout,
+    # with a kind column to split the rows again
+    latest_detections = select(
+        literal("detection").label("kind"),
+        Detection.id,
+        Detection.timestamp,
+        Detection.product_id.label("key"),
+        Detection.product_name,
+        Detection.x_position,
+        Detection.y_position,
+        cast(null(), Float).label("distance_cm"),
+        Detection.status
+    ).order_by(Detection.timestamp.desc()).limit(limit).subquery()
+    
+    latest_uwb = select(
+        literal("uwb").label("kind"),
+        UWBMeasurement.id,
+        UWBMeasurement.timestamp,
+        UWBMeasurement.mac_address.label("key"),
+        cast(null(), String).label("product_name"),
+        cast(null(), Float).label("x_position"),
+        cast(null(), Float).label("y_position"),
+        UWBMeasurement.distance_cm,
+        UWBMeasurement.status
+    ).order_by(UWBMeasurement.timestamp.desc()).limit(limit).subquery()
     
-    uwb_measurements = db.query(UWBMeasurement)\
-        .order_by(UWBMeasurement.timestamp.desc())\
-        .limit(limit)\
-        .all()
+    rows = db.execute(union_all(select(latest_detections), select(latest_uwb))).all()
+    # UNION ALL does not preserve the per-branch order
+    rows.sort(key=lambda row: row.timestamp, reverse=True)
     
+    # Flat rows already match LatestDataResponse - encode directly, skipping model construction
+    # (orjson writes datetimes in isoformat() form itself)
+    detections = []
+    uwb_measurements = []
+    for row in rows:
+        if row.kind == "detection":
+            detections.append({
+                "id": row.id,
+                "timestamp": row.timestamp,
+                "product_id": row.key,
+                "product_name": row.product_name,
+                "x_position": row.x_position,
+                "y_position": row.y_position,
+                "status": row.status
+            })
+        else:
+            uwb_measurements.append({
+                "id": row.id,
+                "timestamp": row.timestamp,
+                "mac_address": row.key,
+                "distance_cm": row.distance_cm,
+                "status": row.status
+            })
+    
+    return ORJSONResponse({
+        "detections": detections,
+        "uwb_measurements": uwb_measurements
+    })
+
+def _item_row(row) -> dict:
+    """JSON row (DetectionResponse shape) for an inventory item + product name"""
     return {
-        "detections": [DetectionResponse(
-            id=d.id,
-            timestamp=d.timestamp.isoformat(),
-            product_id=d.product_id,
-            product_name=d.product_name,
-            x_position=d.x_position,
-            y_position=d.y_position,
-            status=d.status
-        ) for d in detections],
-        "uwb_measurements": [UWBMeasurementResponse(
-            id=u.id,
-            timestamp=u.timestamp.isoformat(),
-            mac_address=u.mac_address,
-            distance_cm=u.distance_cm,
-            status=u.status
-        ) for u in uwb_measurements]
+        "id": row.id,
+        # Left as a datetime: orjson encodes it in isoformat() form
+        "timestamp": row.last_seen_at,
+        "product_id": row.rfid_tag,
+        "product_name": row.name,
+        "x_position": row.x_position,
+        "y_position": row.y_position,
+        "status": row.status
     }
 
+# Constant-shape statement built once at import: each request reuses it instead
+# of constructing a new Select
+_MAP_ITEMS_QUERY = select(
+    InventoryItem.id,
+    InventoryItem.last_seen_at,
+    InventoryItem.rfid_tag,
+    Product.name,
+    InventoryItem.x_position,
+    InventoryItem.y_position,
+    InventoryItem.status
+)\
+    .join(Product, InventoryItem.product_id == Product.id)\
+    .where(InventoryItem.x_position.isnot(None))\
+    .where(InventoryItem.y_position.isnot(None))\
+    .where(InventoryItem.last_seen_at.isnot(None))\
+    .order_by(InventoryItem.id)
+
 @router.get("/data/items", response_model=List[DetectionResponse])
-def get_all_items(db: Session = Depends(get_db)):
+def get_all_items():
     """Get all items from inventory that have been detected at least once.
     
     Returns items that have valid positions AND have been seen (last_seen_at is not null).
     Items that have never been scanned won't appear on the map until detected.
+    The list has no LIMIT, so it is streamed in chunks from a server-side cursor.
     """
     # Only return items that have been detected at least once
     # This prevents all items from showing as "green" before the scanner passes them
-    items = db.query(InventoryItem, Product)\
-        .join(Product, InventoryItem.product_id == Product.id)\
-        .filter(InventoryItem.x_position.isnot(None))\
-        .filter(InventoryItem.y_position.isnot(None))\
-        .filter(InventoryItem.last_seen_at.isnot(None))\
-        .order_by(InventoryItem.id)\
-        .all()
-    
-    return [DetectionResponse(
-        id=item.id,
-        timestamp=item.last_seen_at.isoformat() if item.last_seen_at else None,
-        product_id=item.rfid_tag,
-        product_name=product.name,
-        x_position=item.x_position,
-        y_position=item.y_position,
-        status=item.status
-    ) for item, product in items]
+    # The session is owned (and closed) by the stream, which outlives the request
+    return stream_json_array(new_session(), _MAP_ITEMS_QUERY, _item_row)
+
+# Built once at import, like _MAP_ITEMS_QUERY
+_MISSING_ITEMS_QUERY = select(
+    InventoryItem.id,
+    InventoryItem.last_seen_at,
+    InventoryItem.rfid_tag,
+    Product.name,
+    InventoryItem.x_position,
+    InventoryItem.y_position,
+    InventoryItem.status
+)\
+    .join(Product, InventoryItem.product_id == Product.id)\
+    .where(InventoryItem.status == 'not present')\
+    .where(InventoryItem.last_seen_at.isnot(None))\
+    .order_by(InventoryItem.id)
 
 @router.get("/data/missing", response_model=List[DetectionResponse])
-def get_missing_items(db: Session = Depends(get_db)):
+def get_missing_items():
     """Get all missing items (status = 'not present' AND was previously seen)
     
     Only returns items that were previously detected by the simulation but are now missing.
     Items that have never been seen (last_seen_at is NULL) are not returned.
+    Streamed like /data/items, since the list has no LIMIT either.
     """
-    missing_items = db.query(InventoryItem, Product)\
-        .join(Product, InventoryItem.product_id == Product.id)\
-        .filter(InventoryItem.status == 'not present')\
-        .filter(InventoryItem.last_seen_at.isnot(None))\
-        .all()
-    
-    return [DetectionResponse(
-        id=item.id,
-        timestamp=item.last_seen_at.isoformat() if item.last_seen_at else None,
-        product_id=item.rfid_tag,
-        product_name=product.name,
-        x_position=item.x_position,
-        y_position=item.y_position,
-        status=item.status
-    ) for item, product in missing_items]
+    # The session is owned (and closed) by the stream, which outlives the request
+    return stream_json_array(new_session(), _MISSING_ITEMS_QUERY, _item_row)
+
+# Tables emptied by a full /data/clear (keep_hours=0), in response-field order
+_CLEARED_TABLES = (TagPosition, Detection, UWBMeasurement, PurchaseEvent, ProductLocationHistory)
 
 @router.delete("/data/clear")
 def clear_tracking_data(keep_hours: int = 0, delete_items: bool = False, db: Session = Depends(get_db)):
@@ -478,7 +686,7 @@ def clear_tracking_data(keep_hours: int = 0, delete_items: bool = False, db: Ses
         products_deleted = 0
         
         if keep_hours > 0:
-            cutoff_time = datetime.utcnow() - timedelta(hours=keep_hours)
+            cutoff_time = _utcnow() - timedelta(hours=keep_hours)
 
             positions_deleted = db.query(TagPosition).filter(
                 TagPosition.timestamp < cutoff_time
@@ -500,15 +708,29 @@ def clear_tracking_data(keep_hours: int = 0, delete_items: bool = False, db: Ses
                 ProductLocationHistory.last_updated < cutoff_time
             ).delete()
         else:
-            positions_deleted = db.query(TagPosition).delete()
-            detections_deleted = db.query(Detection).delete()
-            uwb_deleted = db.query(UWBMeasurement).delete()
+            if db.get_bind().dialect.name == "postgresql":
+                # TRUNCATE drops every row at once instead of deleting (and vacuuming)
+                # them one by one; the exact counts are taken first, in one statement
+                (positions_deleted, detections_deleted, uwb_deleted,
+                 purchase_events_deleted, location_history_deleted) = db.execute(select(*(
+                    select(func.count()).select_from(model).scalar_subquery()
+                    for model in _CLEARED_TABLES
+                ))).one()
+                db.execute(text(
+                    "TRUNCATE " + ", ".join(model.__tablename__ for model in _CLEARED_TABLES) + " RESTART IDENTITY"
+                ))
+            else:
+                positions_deleted = db.query(TagPosition).delete()
+                detections_deleted = db.query(Detection).delete()
+                uwb_deleted = db.query(UWBMeasurement).delete()
+                purchase_events_deleted = db.query(PurchaseEvent).delete()
+                location_history_deleted = db.query(ProductLocationHistory).delete()
             
             if delete_items:
                 # Complete deletion - for fresh start in simulation mode
                 inventory_deleted = db.query(InventoryItem).delete()
                 products_deleted = db.query(Product).delete()
-                logger.info(f"Deleted all items ({inventory_deleted}) and products ({products_deleted})")
+                logger.info("Deleted all items (%s) and products (%s)", inventory_deleted, products_deleted)
             else:
                 # Reset inventory items to initial state (not visible on map until simulation runs)
                 # Also reset positions so simulation can set fresh shelf positions
@@ -517,23 +739,19 @@ def clear_tracking_data(keep_hours: int = 0, delete_items: bool = False, db: Ses
                     InventoryItem.last_seen_at: None,
                     InventoryItem.x_position: None,
                     InventoryItem.y_position: None
-                })
+                }, synchronize_session=False)
                 inventory_deleted = 0  # Items not deleted, just reset
             
-            purchase_events_deleted = db.query(PurchaseEvent).delete()
-            location_history_deleted = db.query(ProductLocationHistory).delete()
-            
-            # Reset all stock levels to zero (fresh start for heatmap)
-            stock_levels = db.query(StockLevel).all()
-            for stock_level in stock_levels:
-                stock_level.max_items_seen = 0
-                stock_level.current_count = 0
-                stock_level.missing_count = 0
-            stock_levels_reset = len(stock_levels)
+            # Reset all stock levels to zero (fresh start for heatmap) in a single UPDATE
+            stock_levels_reset = db.query(StockLevel).update({
+                StockLevel.max_items_seen: 0,
+                StockLevel.current_count: 0,
+                StockLevel.missing_count: 0
+            }, synchronize_session=False)
         
         db.commit()
         
-        logger.info(f"Cleared data: {positions_deleted} positions, {detections_deleted} detections, {uwb_deleted} UWB, location_history={location_history_deleted}")
+        logger.info("Cleared data: %s positions, %s detections, %s UWB, location_history=%s", positions_deleted, detections_deleted, uwb_deleted, location_history_deleted)
         
         return {
             "message": "Tracking data cleared successfully" + (" (items deleted)" if delete_items else " (items reset)"),
@@ -553,10 +771,16 @@ def clear_tracking_data(keep_hours: int = 0, delete_items: bool = False, db: Ses
 @router.get("/search/items")
 def search_items(q: str, db: Session = Depends(get_db)):
     """Search for items by name or RFID tag"""
-    from sqlalchemy import func, case
-    
     search_term = f"%{q}%"
     
+    # Products whose name/SKU match, or that have an item with a matching RFID tag
+    # (each ILIKE can use the trigram indexes from migration 014)
+    matching_products = union(
+        select(Product.id).where(Product.name.ilike(search_term) | Product.sku.ilike(search_term)),
+        select(InventoryItem.product_id).where(InventoryItem.rfid_tag.ilike(search_term))
+    )
+    
+    # Aggregate only the matching products instead of the whole inventory
     subquery = db.query(
         InventoryItem.product_id,
         func.min(InventoryItem.id).label('first_item_id'),
@@ -564,6 +788,7 @@ def search_items(q: str, db: Session = Depends(get_db)):
         func.sum(case((InventoryItem.status == 'present', 1), else_=0)).label('present_count'),
         func.sum(case((InventoryItem.status == 'not present', 1), else_=0)).label('missing_count')
     )\
+    .filter(InventoryItem.product_id.in_(matching_products))\
     .group_by(InventoryItem.product_id)\
     .subquery()
     
@@ -574,13 +799,8 @@ def search_items(q: str, db: Session = Depends(get_db)):
         subquery.c.present_count,
         subquery.c.missing_count
     )\
-    .join(Product, InventoryItem.product_id == Product.id)\
     .join(subquery, InventoryItem.id == subquery.c.first_item_id)\
-    .filter(
-        (Product.name.ilike(search_term)) |
-        (InventoryItem.rfid_tag.ilike(search_term)) |
-        (Product.sku.ilike(search_term))
-    )\
+    .join(Product, InventoryItem.product_id == Product.id)\
     .limit(50)\
     .all()
     
@@ -609,61 +829,83 @@ def search_items(q: str, db: Session = Depends(get_db)):
         "items": results
     }
 
+# Planner statistics, for row-count estimates on PostgreSQL
+_pg_class = table("pg_class", column("relname"), column("reltuples"))
+
+def _row_count_expr(db: Session, model):
+    """
+    Scalar row-count expression for large append-only tables.
+    On PostgreSQL this uses the planner estimate from pg_class (O(1), refreshed
+    by autovacuum/ANALYZE); other databases fall back to an exact COUNT(*).
+    """
+    exact = select(func.count(model.id)).scalar_subquery()
+    if db.get_bind().dialect.name != "postgresql":
+        return exact
+    
+    estimate = select(cast(_pg_class.c.reltuples, BigInteger))\
+        .where(_pg_class.c.relname == model.__tablename__)\
+        .scalar_subquery()
+    # reltuples is -1 until the table has been analyzed at least once
+    return case((estimate >= 0, estimate), else_=exact)
+
 @router.get("/stats")
 def get_stats(db: Session = Depends(get_db)):
     """Get basic statistics about stored data"""
-    total_detections = db.query(Detection).count()
-    total_uwb = db.query(UWBMeasurement).count()
+    # Everything in one round trip: each statistic is a scalar subquery.
+    # Item counts come from the (small, indexed) inventory table instead of
+    # DISTINCT scans over the detection log.
+    seen_items = select(func.count(InventoryItem.id))\
+        .where(InventoryItem.last_seen_at.isnot(None))
     
-    unique_items = db.query(Detection.product_id).distinct().count()
-    missing_items = db.query(Detection.product_id)\
-        .filter(Detection.status == 'not present')\
-        .distinct().count()
-    
-    latest_detection = db.query(Detection).order_by(Detection.timestamp.desc()).first()
-    latest_uwb = db.query(UWBMeasurement).order_by(UWBMeasurement.timestamp.desc()).first()
+    stats = db.execute(select(
+        _row_count_expr(db, Detection).label("total_detections"),
+        _row_count_expr(db, UWBMeasurement).label("total_uwb"),
+        seen_items.scalar_subquery().label("unique_items"),
+        seen_items.where(InventoryItem.status == 'not present').scalar_subquery().label("missing_items"),
+        select(func.max(Detection.timestamp)).scalar_subquery().label("latest_detection_time"),
+        select(func.max(UWBMeasurement.timestamp)).scalar_subquery().label("latest_uwb_time")
+    )).one()
     
     return {
-        "total_detections": total_detections,
-        "unique_items": unique_items,
-        "missing_items": missing_items,
-        "total_uwb_measurements": total_uwb,
-        "latest_detection_time": latest_detection.timestamp.isoformat() if latest_detection else None,
-        "latest_uwb_time": latest_uwb.timestamp.isoformat() if latest_uwb else None
+        "total_detections": stats.total_detections,
+        "unique_items": stats.unique_items,
+        "missing_items": stats.missing_items,
+        "total_uwb_measurements": stats.total_uwb,
+        "latest_detection_time": stats.latest_detection_time.isoformat() if stats.latest_detection_time else None,
+        "latest_uwb_time": stats.latest_uwb_time.isoformat() if stats.latest_uwb_time else None
     }
 
 @router.get("/items/{rfid_tag}")
 def get_item_detail(rfid_tag: str, db: Session = Depends(get_db)):
     """Get detailed information about a specific item by RFID tag"""
-    item = db.query(InventoryItem)\
+    # Status counts over the item's product, located through the tag (the alias
+    # keeps the inner tag lookup from correlating with the counted rows)
+    peers = aliased(InventoryItem)
+    counts = db.query(
+        peers.product_id,
+        func.count().filter(peers.status == 'present').label("in_stock"),
+        func.count().filter(peers.status == 'not present').label("missing"),
+        func.count().label("total")
+    ).filter(
+        peers.product_id == select(InventoryItem.product_id)
+        .where(InventoryItem.rfid_tag == rfid_tag)
+        .scalar_subquery()
+    ).group_by(peers.product_id).subquery()
+    
+    # Item, product and stock counts in one round trip
+    row = db.query(InventoryItem, Product, counts.c.in_stock, counts.c.missing, counts.c.total)\
+        .outerjoin(Product, Product.id == InventoryItem.product_id)\
+        .outerjoin(counts, counts.c.product_id == InventoryItem.product_id)\
         .filter(InventoryItem.rfid_tag == rfid_tag)\
         .first()
     
-    if not item:
+    if not row:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    product = db.query(Product).filter(Product.id == item.product_id).first()
+    item, product, same_name_count, missing_count, total_count = row
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    same_name_count = db.query(InventoryItem)\
-        .filter(
-            InventoryItem.product_id == item.product_id,
-            InventoryItem.status == "present"
-        )\
-        .count()
-    
-    missing_count = db.query(InventoryItem)\
-        .filter(
-            InventoryItem.product_id == item.product_id,
-            InventoryItem.status == "not present"
-        )\
-        .count()
-    
-    total_count = db.query(InventoryItem)\
-        .filter(InventoryItem.product_id == item.product_id)\
-        .count()
-    
     return {
         "rfid_tag": item.rfid_tag,
         "product_id": product.id,
@@ -685,123 +927,213 @@ def get_item_detail(rfid_tag: str, db: Session = Depends(get_db)):
         }
     }
 
-@router.post("/data/bulk")
-def receive_bulk_detections(data: dict, db: Session = Depends(get_db)):
+def _update_items_from_values(db: Session, item_updates: Dict[str, tuple]) -> None:
+    """
+    Apply per-tag (status, x, y, last_seen_at) updates to inventory items.
+    PostgreSQL gets one UPDATE ... FROM (VALUES ...) statement; other databases
+    an executemany of the same UPDATE. A NULL last_seen_at keeps the stored value,
+    and unknown tags simply match no row.
+    """
+    if not item_updates:
+        return
+    
+    if db.get_bind().dialect.name == "postgresql":
+        updates = values(
+            column("rfid_tag", String),
+            column("status", String),
+            column("x_position", Float),
+            column("y_position", Float),
+            column("last_seen_at", DateTime),
+            name="v"
+        ).data([(tag, *fields) for tag, fields in item_updates.items()])
+        
+        # VALUES renders NULLs untyped, and PostgreSQL types an all-NULL column
+        # as text - the casts keep a chunk without positions/sightings valid
+        db.execute(
+            update(InventoryItem)
+            .where(InventoryItem.rfid_tag == updates.c.rfid_tag)
+            .values(
+                status=updates.c.status,
+                x_position=cast(updates.c.x_position, Float),
+                y_position=cast(updates.c.y_position, Float),
+                last_seen_at=func.coalesce(cast(updates.c.last_seen_at, DateTime), InventoryItem.last_seen_at)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return
+    
+    items = InventoryItem.__table__
+    db.execute(
+        update(items)
+        .where(items.c.rfid_tag == bindparam("v_rfid_tag"))
+        .values(
+            status=bindparam("v_status"),
+            x_position=bindparam("v_x"),
+            y_position=bindparam("v_y"),
+            last_seen_at=func.coalesce(bindparam("v_last_seen_at", type_=DateTime), items.c.last_seen_at)
+        ),
+        [{
+            "v_rfid_tag": tag,
+            "v_status": status_val,
+            "v_x": x,
+            "v_y": y,
+            "v_last_seen_at": seen_at
+        } for tag, (status_val, x, y, seen_at) in item_updates.items()]
+    )
+
+@router.post("/data/bulk", openapi_extra=_json_body_openapi(BulkDetectionPacket))
+def receive_bulk_detections(
+    packet: BulkDetectionPacket = Depends(_json_body(BulkDetectionPacket)),
+    db: Session = Depends(get_db)
+):
     """
     Receive bulk RFID detections from simulation
     Optimized for high-throughput data ingestion
     """
-    detections = data.get("detections", [])
+    detections = packet.detections
     if not detections:
         return {"status": "success", "processed": 0}
     
     try:
-        timestamp = datetime.utcnow()
+        _async_commit(db)
+        timestamp = _utcnow()
         processed = 0
         
-        for detection in detections:
-            # Normalize status
-            status_val = detection.get("status", "present")
-            if status_val == 'missing':
-                status_val = 'not present'
-            
-            # Store detection
-            det = Detection(
-                timestamp=timestamp,
-                product_id=detection.get("product_id"),
-                product_name=detection.get("product_name"),
-                x_position=detection.get("x_position"),
-                y_position=detection.get("y_position"),
-                status=status_val
-            )
-            db.add(det)
-            
-            # Update inventory item
-            inventory_item = db.query(InventoryItem).filter(
-                InventoryItem.rfid_tag == detection.get("product_id")
-            ).first()
-            
-            if inventory_item:
-                inventory_item.status = status_val
-                inventory_item.x_position = detection.get("x_position")
-                inventory_item.y_position = detection.get("y_position")
+        # Process in fixed-size chunks: one COPY/insert and one UPDATE ... FROM (VALUES ...)
+        # per chunk, with a single commit for the whole batch
+        for chunk in _chunked(detections, BULK_INSERT_CHUNK_SIZE):
+            detection_rows = []
+            # rfid_tag -> (status, x, y, last_seen_at); the last detection of a tag wins
+            item_updates: Dict[str, tuple] = {}
+            for detection in chunk:
+                rfid_tag = detection.product_id
+                x_position = detection.x_position
+                y_position = detection.y_position
+                
+                # Normalize status
+                status_val = detection.status
+                if status_val == 'missing':
+                    status_val = 'not present'
+                
+                # Detection rows are never read back - collect plain mappings for one COPY/executemany
+                detection_rows.append({
+                    "timestamp": timestamp,
+                    "product_id": rfid_tag,
+                    "product_name": detection.product_name,
+                    "x_position": x_position,
+                    "y_position": y_position,
+                    "status": status_val
+                })
+                
                 # Only update last_seen_at when item is present (detected)
                 # This ensures "missing" items only show up if they were previously seen
-                if status_val == 'present':
-                    inventory_item.last_seen_at = timestamp
+                previous = item_updates.get(rfid_tag)
+                seen_at = timestamp if status_val == 'present' or (previous and previous[3]) else None
+                item_updates[rfid_tag] = (status_val, x_position, y_position, seen_at)
+                
+                processed += 1
             
-            processed += 1
+            insert_rows(db, Detection, detection_rows)
+            _update_items_from_values(db, item_updates)
         
         db.commit()
         return {"status": "success", "processed": processed}
     
     except Exception as e:
         db.rollback()
-        logger.error(f"Bulk detection error: {e}")
+        logger.exception("Bulk detection error")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/uwb/bulk")
-def receive_bulk_uwb(data: dict, db: Session = Depends(get_db)):
+def _triangulate_and_store(mode: ConfigMode, timestamp: datetime, readings: List[tuple]):
+    """
+    Background task for /uwb/bulk: triangulate the employee position from
+    (mac_address, distance_cm) readings and store it.
+    Runs after the response with its own session on the request's database.
+    """
+    db = new_session(mode)
+    try:
+        anchors = anchor_cache.get(db)
+        if len(anchors) < 2:
+            return
+        
+        # Structure-of-arrays inputs: anchor coordinates (K, 2) and distances (K,)
+        matched = []
+        distances = []
+        for mac_address, distance_cm in readings:
+            i = anchors.index_by_mac.get(mac_address)
+            if i is not None:
+                matched.append(i)
+                distances.append(distance_cm)
+        
+        if len(matched) < 2:
+            return
+        
+        result = _triangulate(anchors, matched, distances)
+        if result:
+            x, y, confidence = result
+            
+            if confidence > 0:
+                # Store calculated position - never read back, so a plain Core
+                # INSERT (no unit of work, no RETURNING id)
+                db.execute(TagPosition.__table__.insert().values(
+                    timestamp=timestamp,
+                    tag_id="employee",
+                    x_position=x,
+                    y_position=y,
+                    confidence=confidence,
+                    num_anchors=len(matched)
+                ))
+                db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("Triangulation failed: %s", e)
+    finally:
+        db.close()
+
+@router.post("/uwb/bulk", openapi_extra=_json_body_openapi(BulkUWBPacket))
+def receive_bulk_uwb(
+    background_tasks: BackgroundTasks,
+    packet: BulkUWBPacket = Depends(_json_body(BulkUWBPacket)),
+    db: Session = Depends(get_db)
+):
     """
     Receive bulk UWB measurements from simulation
     Optimized for high-throughput data ingestion
+    
+    Measurements are committed before responding; triangulation runs as a
+    background task after the response is sent.
     """
-    measurements = data.get("measurements", [])
+    measurements = packet.measurements
     if not measurements:
         return {"status": "success", "processed": 0}
     
     try:
-        timestamp = datetime.utcnow()
-        processed = 0
+        _async_commit(db)
+        timestamp = _utcnow()
         
-        for measurement in measurements:
-            uwb = UWBMeasurement(
-                timestamp=timestamp,
-                mac_address=measurement.get("mac_address"),
-                distance_cm=measurement.get("distance_cm"),
-                status=measurement.get("status", "0x01")
-            )
-            db.add(uwb)
-            processed += 1
-        
-        # Try triangulation if we have enough measurements
-        if len(measurements) >= 2:
-            try:
-                anchors = db.query(Anchor).filter(Anchor.is_active == True).all()
-                if len(anchors) >= 2:
-                    # Build measurement tuples (anchor_x, anchor_y, distance)
-                    anchor_dict = {a.mac_address: (a.x_position, a.y_position) for a in anchors}
-                    measurement_tuples = []
-                    for m in measurements:
-                        mac = m.get("mac_address")
-                        if mac in anchor_dict:
-                            ax, ay = anchor_dict[mac]
-                            distance = m.get("distance_cm", 0)
-                            measurement_tuples.append((ax, ay, distance))
-                    
-                    if len(measurement_tuples) >= 2:
-                        result = TriangulationService.calculate_position(measurement_tuples)
-                        if result:
-                            x, y, confidence = result
-                            
-                            if confidence > 0:
-                                # Store calculated position
-                                position = TagPosition(
-                                    timestamp=timestamp,
-                                    tag_id="employee",
-                                    x_position=x,
-                                    y_position=y,
-                                    confidence=confidence,
-                                    num_anchors=len(measurement_tuples)
-                                )
-                                db.add(position)
-            except Exception as e:
-                logger.warning(f"Triangulation failed: {e}")
+        for chunk in _chunked(measurements, BULK_INSERT_CHUNK_SIZE):
+            insert_rows(db, UWBMeasurement, [{
+                "timestamp": timestamp,
+                "mac_address": measurement.mac_address,
+                "distance_cm": measurement.distance_cm,
+                "status": measurement.status
+            } for measurement in chunk])
+        processed = len(measurements)
         
         db.commit()
-        return {"status": "success", "processed": processed}
     
     except Exception as e:
         db.rollback()
-        logger.error(f"Bulk UWB error: {e}")
+        logger.exception("Bulk UWB error")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    # Try triangulation if we have enough measurements
+    if len(measurements) >= 2:
+        background_tasks.add_task(
+            _triangulate_and_store,
+            config_state.mode,
+            timestamp,
+            [(m.mac_address, m.distance_cm) for m in measurements]
+        )
+    
+    return {"status": "success", "processed": processed}
@@ -1,13 +1,15 @@
 """Individual inventory item management router"""
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import exists, select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 
-from ..database import get_db
+from ..database import get_db, new_session
 from ..models import InventoryItem, Product
 from ..core import logger
+from ..utils.streaming import stream_json_array
 
 router = APIRouter(prefix="/items", tags=["items"])
 
@@ -19,22 +21,40 @@ class InventoryItemCreate(BaseModel):
     y_position: Optional[float] = None
 
 
+# Constant-shape statement built once at import: each request reuses it instead
+# of constructing a new Select. Same fields and order as InventoryItem.to_dict();
+# orjson writes the datetimes in isoformat() form itself
+_ALL_ITEMS_QUERY = select(
+    InventoryItem.id,
+    InventoryItem.rfid_tag,
+    InventoryItem.product_id,
+    InventoryItem.status,
+    InventoryItem.x_position,
+    InventoryItem.y_position,
+    InventoryItem.last_seen_at,
+    InventoryItem.created_at,
+    InventoryItem.updated_at,
+    InventoryItem.consecutive_misses,
+    InventoryItem.last_detection_rssi,
+    InventoryItem.first_miss_at
+).order_by(InventoryItem.id)
+
 @router.get("")
-def get_all_items(db: Session = Depends(get_db)):
-    """Get all inventory items"""
-    items = db.query(InventoryItem).all()
-    return [item.to_dict() for item in items]
+def get_all_items():
+    """Get all inventory items (streamed - the list has no LIMIT)"""
+    # The session is owned (and closed) by the stream, which outlives the request
+    return stream_json_array(new_session(), _ALL_ITEMS_QUERY, lambda row: row._asdict())
 
 @router.post("")
 def create_inventory_item(item: InventoryItemCreate, db: Session = Depends(get_db)):
     """Create a new inventory item"""
     # Check if product exists
-    product = db.query(Product).filter(Product.id == item.product_id).first()
+    product = db.get(Product, item.product_id)
     if not product:
         raise HTTPException(status_code=404, detail=f"Product {item.product_id} not found")
     
     # Check if RFID tag already exists
-    existing = db.query(InventoryItem).filter(InventoryItem.rfid_tag == item.rfid_tag).first()
+    existing = db.scalar(select(exists().where(InventoryItem.rfid_tag == item.rfid_tag)))
     if existing:
         raise HTTPException(status_code=400, detail=f"Item with RFID tag {item.rfid_tag} already exists")
     
@@ -51,7 +71,6 @@ def create_inventory_item(item: InventoryItemCreate, db: Session = Depends(get_d
     
     db.add(new_item)
     db.commit()
-    db.refresh(new_item)
     
     logger.info(f"Created inventory item {item.rfid_tag} for product {product.sku}")
     
@@ -65,7 +84,7 @@ def delete_inventory_item(rfid_tag: str, db: Session = Depends(get_db)):
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    product = db.query(Product).filter(Product.id == item.product_id).first()
+    product = db.get(Product, item.product_id)
     product_info = f"{product.name} (SKU: {product.sku})" if product else f"Product ID {item.product_id}"
     
     db.delete(item)
@@ -89,7 +108,6 @@ def update_item_status(rfid_tag: str, status_update: dict, db: Session = Depends
     
     item.status = new_status
     db.commit()
-    db.refresh(item)
     
     logger.info(f"Updated item {rfid_tag} status to {new_status}")
     
@@ -117,6 +135,5 @@ def update_item_position(rfid_tag: str, position: PositionUpdate, db: Session =
     item.x_position = position.x_position
     item.y_position = position.y_position
     db.commit()
-    db.refresh(item)
     
     return {"success": True, "rfid_tag": rfid_tag, "x_position": item.x_position, "y_position": item.y_position}
@@ -1,13 +1,18 @@
 """Position calculation and tracking router"""
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import List
 
+import numpy as np
+
 from ..database import get_db
 from ..models import TagPosition, Anchor, UWBMeasurement
 from ..schemas import TagPositionResponse
 from ..triangulation import TriangulationService
+from ..services.anchor_cache import anchor_cache
 from ..core import logger
 
 router = APIRouter(prefix="/positions", tags=["positions"])
@@ -15,21 +20,22 @@ router = APIRouter(prefix="/positions", tags=["positions"])
 @router.get("/latest", response_model=List[TagPositionResponse])
 def get_latest_positions(limit: int = 50, db: Session = Depends(get_db)):
     """Get the most recent calculated tag positions"""
-    logger.info(f"Fetching latest {limit} positions")
-    positions = db.query(TagPosition)\
-        .order_by(TagPosition.timestamp.desc())\
+    logger.info("Fetching latest %d positions", limit)
+    rows = db.query(
+        TagPosition.id,
+        TagPosition.timestamp,
+        TagPosition.tag_id,
+        TagPosition.x_position,
+        TagPosition.y_position,
+        TagPosition.confidence,
+        TagPosition.num_anchors
+    ).order_by(TagPosition.timestamp.desc())\
         .limit(limit)\
         .all()
     
-    return [TagPositionResponse(
-        id=p.id,
-        timestamp=p.timestamp.isoformat(),
-        tag_id=p.tag_id,
-        x_position=p.x_position,
-        y_position=p.y_position,
-        confidence=p.confidence,
-        num_anchors=p.num_anchors
-    ) for p in positions]
+    # Rows already match TagPositionResponse - encode directly, skipping model
+    # construction (orjson writes the timestamps in isoformat() form itself)
+    return ORJSONResponse([row._asdict() for row in rows])
 
 @router.post("/calculate-position")
 def calculate_position(tag_id: str, db: Session = Depends(get_db)):
@@ -37,49 +43,42 @@ def calculate_position(tag_id: str, db: Session = Depends(get_db)):
     Calculate current position of a tag based on recent UWB measurements
     
     This endpoint:
-    1. Gets the latest UWB measurements for all active anchors
-    2. Looks up anchor positions from the database
-    3. Performs trilateration to calculate tag position
-    4. Stores the result in tag_positions table
+    1. Gets the latest UWB measurement for each active anchor, joined with
+       the anchor position in a single query
+    2. Performs trilateration to calculate tag position
+    3. Stores the result in tag_positions table
     """
-    # Get active anchors
-    anchors = db.query(Anchor).filter(Anchor.is_active == True).all()
-    
-    if len(anchors) < 2:
-        raise HTTPException(
-            status_code=400, 
-            detail="At least 2 active anchors required for position calculation"
-        )
-    
-    # Get latest UWB measurement for each anchor (within last 5 seconds)
+    # Latest UWB measurement per active anchor (within last 5 seconds), joined to the
+    # anchor position in one query instead of one query per anchor
     cutoff_time = datetime.utcnow() - timedelta(seconds=5)
-    measurements = []
+    latest = db.query(
+        UWBMeasurement.mac_address,
+        UWBMeasurement.distance_cm,
+        func.row_number().over(
+            partition_by=UWBMeasurement.mac_address,
+            order_by=(UWBMeasurement.timestamp.desc(), UWBMeasurement.id.desc())
+        ).label("rank")
+    ).filter(UWBMeasurement.timestamp >= cutoff_time).subquery()
     
-    for anchor in anchors:
-        uwb = db.query(UWBMeasurement)\
-            .filter(
-                UWBMeasurement.mac_address == anchor.mac_address,
-                UWBMeasurement.timestamp >= cutoff_time
-            )\
-            .order_by(UWBMeasurement.timestamp.desc())\
-            .first()
-        
-        if uwb:
-            # Convert cm to same units as anchor positions
-            measurements.append((
-                anchor.x_position,
-                anchor.y_position,
-                uwb.distance_cm
-            ))
+    rows = db.query(Anchor.x_position, Anchor.y_position, latest.c.distance_cm)\
+        .join(latest, latest.c.mac_address == Anchor.mac_address)\
+        .filter(Anchor.is_active == True, latest.c.rank == 1)\
+        .all()
     
-    if len(measurements) < 2:
+    if len(rows) < 2:
+        if len(anchor_cache.get(db)) < 2:
+            raise HTTPException(
+                status_code=400, 
+                detail="At least 2 active anchors required for position calculation"
+            )
         raise HTTPException(
             status_code=400,
             detail="Not enough recent measurements. Need at least 2 anchors with data from last 5 seconds"
         )
     
     # Calculate position using triangulation
-    result = TriangulationService.calculate_position(measurements)
+    data = np.array(rows, dtype=np.float64)
+    result = TriangulationService.calculate_position_arrays(data[:, :2], data[:, 2])
     
     if result is None:
         raise HTTPException(status_code=500, detail="Position calculation failed")
@@ -93,13 +92,12 @@ def calculate_position(tag_id: str, db: Session = Depends(get_db)):
         x_position=x,
         y_position=y,
         confidence=confidence,
-        num_anchors=len(measurements)
+        num_anchors=len(rows)
     )
     db.add(position)
     db.commit()
-    db.refresh(position)
     
-    logger.info(f"Calculated position for {tag_id}: ({x:.2f}, {y:.2f}) with {len(measurements)} anchors")
+    logger.info(f"Calculated position for {tag_id}: ({x:.2f}, {y:.2f}) with {len(rows)} anchors")
     
     return TagPositionResponse(
         id=position.id,
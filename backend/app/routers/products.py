@@ -1,62 +1,138 @@
 """Product management router"""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import exists, func, select, update
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
+import os
 import random
-import uuid
+import sys
+import threading
+from functools import lru_cache
 
-from ..database import get_db
-from ..models import Product, StockLevel
+import numpy as np
+
+from ..config import config_state
+from ..database import get_db, new_session
+from ..models import Product, StockLevel, InventoryItem
 from ..schemas import ProductCreate
 from ..core import logger
+from ..utils.streaming import stream_json_array
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+def _unused_rfid_tags(db: Session, count: int, prefix: str) -> List[str]:
+    """
+    `count` random RFID tags (prefix + 8 hex digits) not yet in inventory_items.
+    Candidates are checked with one IN query per round and collisions redrawn,
+    so the bulk insert never aborts on the UNIQUE index.
+    """
+    tags = set()
+    while len(tags) < count:
+        missing = count - len(tags)
+        suffixes = os.urandom(4 * missing).hex().upper()
+        candidates = {f"{prefix}{suffixes[8 * i:8 * i + 8]}" for i in range(missing)} - tags
+        existing = set(db.scalars(
+            select(InventoryItem.rfid_tag).where(InventoryItem.rfid_tag.in_(candidates))
+        ))
+        tags |= candidates - existing
+    return list(tags)
+
+def _product_row(row) -> dict:
+    """JSON row (Product.to_dict() shape) for a product column row"""
+    return {
+        "id": row.id,
+        "sku": row.sku,
+        "name": row.name,
+        "category": row.category,
+        "unit_price": float(row.unit_price) if row.unit_price else None,
+        "size": row.size,
+        "color": row.color,
+        "reorder_threshold": row.reorder_threshold,
+        "optimal_stock_level": row.optimal_stock_level,
+        # Left as datetimes: orjson encodes them in isoformat() form
+        "created_at": row.created_at,
+        "updated_at": row.updated_at
+    }
+
+# Constant-shape statement built once at import: each request reuses it instead
+# of constructing a new Select
+_ALL_PRODUCTS_QUERY = select(
+    Product.id,
+    Product.sku,
+    Product.name,
+    Product.category,
+    Product.unit_price,
+    Product.size,
+    Product.color,
+    Product.reorder_threshold,
+    Product.optimal_stock_level,
+    Product.created_at,
+    Product.updated_at
+).order_by(Product.id)
+
 @router.get("")
-def get_products(db: Session = Depends(get_db)):
-    """Get all products in catalog"""
-    products = db.query(Product).all()
-    return [p.to_dict() for p in products]
+def get_products():
+    """Get all products in catalog (streamed - the catalog has no LIMIT)"""
+    # The session is owned (and closed) by the stream, which outlives the request
+    return stream_json_array(new_session(), _ALL_PRODUCTS_QUERY, _product_row)
 
 @router.get("/with-stock")
 def get_products_with_stock(db: Session = Depends(get_db)):
     """Get all products with their current stock counts from InventoryItem"""
-    from ..models import InventoryItem
-    from sqlalchemy import func
     
     # Count items by product, grouped by status
     stock_counts = db.query(
+        InventoryItem.product_id,
+        func.count().filter(InventoryItem.status == 'present').label('current_stock'),
+        func.count().label('max_detected')
+    ).group_by(InventoryItem.product_id).subquery()
+    
+    # One query projecting only the response columns - no Product entities are loaded
+    rows = db.query(
         Product.id,
+        Product.sku,
         Product.name,
-        func.count(InventoryItem.id).filter(InventoryItem.status == 'present').label('current_stock'),
-        func.count(InventoryItem.id).label('max_detected')
+        Product.category,
+        Product.unit_price,
+        Product.size,
+        Product.color,
+        Product.reorder_threshold,
+        Product.optimal_stock_level,
+        Product.created_at,
+        Product.updated_at,
+        func.coalesce(stock_counts.c.current_stock, 0).label('current_stock'),
+        func.coalesce(stock_counts.c.max_detected, 0).label('max_detected')
     ).outerjoin(
-        InventoryItem, Product.id == InventoryItem.product_id
-    ).group_by(Product.id, Product.name).all()
-    
-    # Create a dict for quick lookup
-    stock_dict = {row.id: {'current_stock': row.current_stock, 'max_detected': row.max_detected} for row in stock_counts}
+        stock_counts, Product.id == stock_counts.c.product_id
+    ).all()
     
-    # Get all products and add stock info
-    products = db.query(Product).all()
-    return [
+    # Same shape as Product.to_dict() plus the stock counts. Returned as an
+    # ORJSONResponse so the plain dicts skip FastAPI's jsonable_encoder pass
+    return ORJSONResponse([
         {
-            **p.to_dict(),
-            'current_stock': stock_dict.get(p.id, {}).get('current_stock', 0),
-            'max_detected': stock_dict.get(p.id, {}).get('max_detected', 0)
+            **_product_row(row),
+            'current_stock': row.current_stock,
+            'max_detected': row.max_detected
         }
-        for p in products
-    ]
+        for row in rows
+    ])
 
-@router.post("/populate-stock")
-def populate_stock_for_all_products(db: Session = Depends(get_db)):
+# Held while a populate-stock / catalog sync job runs, so repeated requests
+# don't insert the same rows twice
+_populate_lock = threading.Lock()
+_catalog_sync_lock = threading.Lock()
+
+# Outcome of the last background run, served by the /status endpoints
+_populate_status = {"running": False, "message": "", "items_created": 0, "products_updated": 0}
+_catalog_sync_status = {"running": False, "message": "", "created": 0, "skipped": 0, "total_catalog_size": 0}
+
+def _populate_stock(db: Session):
     """
     Add inventory items to all products to match their optimal_stock_level.
-    Creates new items with unique RFID tags and random shelf positions.
+    Returns (items_created, products_updated).
     """
-    from ..models import InventoryItem
-    from sqlalchemy import func
     
     # Get current stock counts per product
     stock_counts = db.query(
@@ -79,53 +155,101 @@ def populate_stock_for_all_products(db: Session = Depends(get_db)):
         {'x': 800, 'y_min': 120, 'y_max': 700},
     ]
     
-    items_created = 0
-    products_updated = 0
-    
+    # Items needed per product, so all positions can be drawn in one pass
+    needed = []
     for product in products:
         current_count = stock_dict.get(product.id, 0)
         target_count = product.optimal_stock_level or 5
         
         if current_count < target_count:
-            items_needed = target_count - current_count
-            products_updated += 1
-            
-            for i in range(items_needed):
-                # Generate unique RFID tag
-                rfid_tag = f"RFID{str(uuid.uuid4().hex)[:8].upper()}"
-                
-                # Random aisle position along shelves (not in walkways)
-                aisle = random.choice(aisles)
-                # Position on shelf edge (left or right of aisle center)
-                shelf_offset = random.choice([-35, 35])  # Shelf width offset
-                x = aisle['x'] + shelf_offset + random.uniform(-5, 5)
-                y = random.uniform(aisle['y_min'] + 20, aisle['y_max'] - 20)
-                
-                new_item = InventoryItem(
-                    rfid_tag=rfid_tag,
-                    product_id=product.id,
-                    status='present',
-                    x_position=round(x, 2),
-                    y_position=round(y, 2)
-                )
-                db.add(new_item)
-                items_created += 1
-    
+            needed.append((product.id, target_count - current_count))
+    products_updated = len(needed)
+    total_needed = sum(count for _, count in needed)
+    
+    # Random aisle positions along shelves (not in walkways), vectorized
+    rng = np.random.default_rng()
+    aisle_x = np.array([aisle['x'] for aisle in aisles], dtype=np.float64)
+    aisle_y_min = np.array([aisle['y_min'] for aisle in aisles], dtype=np.float64)
+    aisle_y_max = np.array([aisle['y_max'] for aisle in aisles], dtype=np.float64)
+    aisle_idx = rng.integers(0, len(aisles), total_needed)
+    # Position on shelf edge (left or right of aisle center)
+    shelf_offset = rng.choice([-35.0, 35.0], total_needed)  # Shelf width offset
+    xs = np.round(aisle_x[aisle_idx] + shelf_offset + rng.uniform(-5, 5, total_needed), 2)
+    ys = np.round(rng.uniform(aisle_y_min[aisle_idx] + 20, aisle_y_max[aisle_idx] - 20), 2)
+    positions = iter(zip(xs.tolist(), ys.tolist()))
+    tags = iter(_unused_rfid_tags(db, total_needed, "RFID"))
+    
+    # New items as plain rows, inserted in one executemany
+    new_items = []
+    for product_id, count in needed:
+        for i in range(count):
+            x, y = next(positions)
+            new_items.append({
+                'rfid_tag': next(tags),
+                'product_id': product_id,
+                'status': 'present',
+                'x_position': x,
+                'y_position': y
+            })
+    
+    if new_items:
+        # Core executemany: column defaults (timestamps, miss counters) still apply
+        db.execute(InventoryItem.__table__.insert(), new_items)
     db.commit()
+    items_created = len(new_items)
     
-    logger.info(f"Populated stock: {items_created} items created for {products_updated} products")
+    logger.info("Populated stock: %d items created for %d products", items_created, products_updated)
     
-    return {
-        "success": True,
-        "items_created": items_created,
-        "products_updated": products_updated,
-        "message": f"Created {items_created} inventory items for {products_updated} products"
-    }
+    return items_created, products_updated
+
+def _run_populate_stock(mode):
+    """Background task: populate stock on its own session for `mode`"""
+    if not _populate_lock.acquire(blocking=False):
+        logger.info("Populate stock already running - skipping")
+        return
+    _populate_status.update(running=True, message="Stock population in progress")
+    db = new_session(mode)
+    try:
+        items_created, products_updated = _populate_stock(db)
+        _populate_status.update(
+            message=f"Created {items_created} inventory items for {products_updated} products",
+            items_created=items_created,
+            products_updated=products_updated
+        )
+    except Exception as e:
+        db.rollback()
+        logger.exception("Populate stock failed")
+        _populate_status.update(message=f"Stock population failed: {e}", items_created=0, products_updated=0)
+    finally:
+        db.close()
+        _populate_status["running"] = False
+        _populate_lock.release()
+
+@router.post("/populate-stock", status_code=202)
+def populate_stock_for_all_products(background_tasks: BackgroundTasks):
+    """
+    Add inventory items to all products to match their optimal_stock_level.
+    Creates new items with unique RFID tags and random shelf positions.
+    
+    The inserts run as a background task after the 202 response is sent,
+    so large catalogs don't hold a worker thread for the whole request.
+    Poll GET /products/populate-stock/status for the result counts.
+    """
+    if _populate_lock.locked():
+        return {"success": True, "status": "running", "message": "Stock population already in progress"}
+    
+    background_tasks.add_task(_run_populate_stock, config_state.mode)
+    return {"success": True, "status": "queued", "message": "Stock population started"}
+
+@router.get("/populate-stock/status")
+def get_populate_stock_status():
+    """Get the status and result counts of the last populate-stock run"""
+    return dict(_populate_status)
 
 @router.post("", status_code=201)
 def create_product(product_data: ProductCreate, db: Session = Depends(get_db)):
     """Create a new product in the catalog"""
-    existing = db.query(Product).filter(Product.sku == product_data.sku).first()
+    existing = db.scalar(select(exists().where(Product.sku == product_data.sku)))
     if existing:
         raise HTTPException(status_code=400, detail=f"Product with SKU {product_data.sku} already exists")
     
@@ -139,7 +263,6 @@ def create_product(product_data: ProductCreate, db: Session = Depends(get_db)):
     )
     db.add(product)
     db.commit()
-    db.refresh(product)
     
     logger.info(f"Created product {product.id}: {product.name} (SKU: {product.sku})")
     
@@ -148,13 +271,13 @@ def create_product(product_data: ProductCreate, db: Session = Depends(get_db)):
 @router.put("/{product_id}")
 def update_product(product_id: int, product_data: ProductCreate, db: Session = Depends(get_db)):
     """Update a product in the catalog"""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
     # Check if SKU is being changed to an existing one
     if product_data.sku != product.sku:
-        existing = db.query(Product).filter(Product.sku == product_data.sku).first()
+        existing = db.scalar(select(exists().where(Product.sku == product_data.sku)))
         if existing:
             raise HTTPException(status_code=400, detail=f"Product with SKU {product_data.sku} already exists")
     
@@ -166,7 +289,6 @@ def update_product(product_id: int, product_data: ProductCreate, db: Session = D
     product.optimal_stock_level = product_data.optimal_stock_level
     
     db.commit()
-    db.refresh(product)
     
     logger.info(f"Updated product {product.id}: {product.name} (SKU: {product.sku})")
     
@@ -179,76 +301,80 @@ def adjust_product_stock(product_id: int, adjustment: dict, db: Session = Depend
     Body: {"current_stock": 10, "max_detected": 15}
     This will add/remove items to match current_stock and ensure max_detected is at least that value
     """
-    from ..models import InventoryItem
-    import random
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
     target_current = adjustment.get('current_stock')
     target_max = adjustment.get('max_detected')
     
-    # Get current counts
-    current_present = db.query(InventoryItem).filter(
-        InventoryItem.product_id == product_id,
-        InventoryItem.status == 'present'
-    ).count()
+    # Get current counts (present and total in one pass)
+    counts = db.query(
+        func.count().filter(InventoryItem.status == 'present').label('present'),
+        func.count().label('total')
+    ).filter(InventoryItem.product_id == product_id).one()
+    current_present = counts.present
+    total_items = counts.total
     
-    total_items = db.query(InventoryItem).filter(
-        InventoryItem.product_id == product_id
-    ).count()
+    # Items to create, inserted in one executemany at the end
+    new_items = []
     
     if target_current is not None:
         diff = target_current - current_present
         
         if diff > 0:
             # Need to add items or change status to present
-            # First try to reactivate not present items
-            inactive_items = db.query(InventoryItem).filter(
+            # First try to reactivate not present items (one UPDATE, no rows loaded)
+            inactive_ids = select(InventoryItem.id).where(
                 InventoryItem.product_id == product_id,
                 InventoryItem.status != 'present'
-            ).limit(diff).all()
-            
-            for item in inactive_items:
-                item.status = 'present'
-                item.last_seen_at = datetime.utcnow()
-                diff -= 1
+            ).limit(diff)
+            reactivated = db.execute(
+                update(InventoryItem)
+                .where(InventoryItem.id.in_(inactive_ids))
+                .values(status='present', last_seen_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            diff -= reactivated
             
             # Create new items if still needed
             for i in range(diff):
-                new_item = InventoryItem(
-                    rfid_tag=f"RFID_{random.randint(10000, 99999)}",
-                    product_id=product_id,
-                    status='present',
-                    x_position=random.uniform(100, 900),
-                    y_position=random.uniform(100, 700)
-                )
-                db.add(new_item)
+                new_items.append({
+                    'product_id': product_id,
+                    'status': 'present',
+                    'x_position': random.uniform(100, 900),
+                    'y_position': random.uniform(100, 700)
+                })
         
         elif diff < 0:
             # Need to remove items (mark as not present)
-            items_to_remove = db.query(InventoryItem).filter(
+            present_ids = select(InventoryItem.id).where(
                 InventoryItem.product_id == product_id,
                 InventoryItem.status == 'present'
-            ).limit(abs(diff)).all()
-            
-            for item in items_to_remove:
-                item.status = 'not present'
+            ).limit(abs(diff))
+            db.execute(
+                update(InventoryItem)
+                .where(InventoryItem.id.in_(present_ids))
+                .values(status='not present')
+                .execution_options(synchronize_session=False)
+            )
     
     if target_max is not None and target_max > total_items:
         # Add items to reach max_detected (as not present)
         diff = target_max - total_items
         for i in range(diff):
-            new_item = InventoryItem(
-                rfid_tag=f"RFID_{random.randint(10000, 99999)}",
-                product_id=product_id,
-                status='not present',
-                x_position=random.uniform(100, 900),
-                y_position=random.uniform(100, 700)
-            )
-            db.add(new_item)
-    
+            new_items.append({
+                'product_id': product_id,
+                'status': 'not present',
+                'x_position': random.uniform(100, 900),
+                'y_position': random.uniform(100, 700)
+            })
+    
+    if new_items:
+        for row, rfid_tag in zip(new_items, _unused_rfid_tags(db, len(new_items), "RFID_")):
+            row['rfid_tag'] = rfid_tag
+        db.execute(InventoryItem.__table__.insert(), new_items)
     db.commit()
     
     logger.info(f"Adjusted stock for product {product_id}: current={target_current}, max={target_max}")
@@ -258,7 +384,7 @@ def adjust_product_stock(product_id: int, adjustment: dict, db: Session = Depend
 @router.get("/{product_id}")
 def get_product(product_id: int, db: Session = Depends(get_db)):
     """Get a specific product by ID"""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product.to_dict()
@@ -266,81 +392,83 @@ def get_product(product_id: int, db: Session = Depends(get_db)):
 @router.get("/{product_id}/items")
 def get_product_items(product_id: int, db: Session = Depends(get_db)):
     """Get all unique RFID-tagged items for a specific product"""
-    from ..models import InventoryItem
     
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
+    if not db.scalar(select(exists().where(Product.id == product_id))):
         raise HTTPException(status_code=404, detail="Product not found")
     
-    items = db.query(InventoryItem).filter(
+    # Rows already have the response shape; orjson writes the datetimes in
+    # isoformat() form itself
+    statement = select(
+        InventoryItem.id,
+        InventoryItem.rfid_tag,
+        InventoryItem.status,
+        InventoryItem.x_position,
+        InventoryItem.y_position,
+        InventoryItem.last_seen_at,
+        InventoryItem.created_at
+    ).where(
         InventoryItem.product_id == product_id
-    ).order_by(InventoryItem.status.desc(), InventoryItem.rfid_tag).all()
+    ).order_by(InventoryItem.status.desc(), InventoryItem.rfid_tag)
     
-    return [
-        {
-            "id": item.id,
-            "rfid_tag": item.rfid_tag,
-            "status": item.status,
-            "x_position": item.x_position,
-            "y_position": item.y_position,
-            "last_seen_at": item.last_seen_at.isoformat() if item.last_seen_at else None,
-            "created_at": item.created_at.isoformat()
-        }
-        for item in items
-    ]
+    # The session is owned (and closed) by the stream, which outlives the request
+    return stream_json_array(new_session(), statement, lambda row: row._asdict())
 
-@router.post("/sync-from-catalog")
-def sync_products_from_simulation_catalog(db: Session = Depends(get_db)):
+# Realistic Decathlon pricing by category (in euros)
+_CATEGORY_PRICING = {
+    "Sports": (15, 45),          # Balls, basic equipment
+    "Footwear": (35, 120),       # Shoes vary widely by type
+    "Fitness": (10, 80),         # Mats cheap, weights expensive
+    "Cardio": (8, 25),           # Jump ropes, accessories
+    "Weights": (20, 100),        # Dumbbells vary by weight
+    "Accessories": (5, 60),      # Water bottles to watches
+    "Electronics": (25, 150),    # Fitness trackers, headphones
+    "Apparel": (12, 65),         # Socks to hoodies
+    "Swimming": (8, 35),         # Caps cheap, goggles moderate
+    "Cycling": (15, 80),         # Accessories to helmets
+    "Nutrition": (10, 45),       # Bars to protein powder
+}
+
+@lru_cache(maxsize=None)
+def _product_catalog():
     """
-    Sync products from simulation PRODUCT_CATALOG to database.
-    Creates products with realistic Decathlon pricing if they don't exist.
-    This ensures simulation and analytics use the same product catalog.
+    PRODUCT_CATALOG from the simulation package, imported once.
+    The simulation directory sits next to backend/ (mounted at /simulation in
+    Docker), so its parent goes on sys.path and the module is imported as
+    simulation.inventory - it uses package-relative imports.
+    A failed import is not cached and is retried on the next call.
     """
-    import sys
-    import os
-    
-    # Import PRODUCT_CATALOG from simulation
-    # Add simulation directory to path
     backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     project_root = os.path.dirname(backend_dir)
-    simulation_dir = os.path.join(project_root, 'simulation')
-    if simulation_dir not in sys.path:
-        sys.path.insert(0, simulation_dir)
-    
-    try:
-        from inventory import PRODUCT_CATALOG
-    except ImportError as e:
-        raise HTTPException(status_code=500, detail=f"Failed to import simulation catalog: {str(e)}")
-    
-    # Realistic Decathlon pricing by category (in euros)
-    category_pricing = {
-        "Sports": (15, 45),          # Balls, basic equipment
-        "Footwear": (35, 120),       # Shoes vary widely by type
-        "Fitness": (10, 80),         # Mats cheap, weights expensive
-        "Cardio": (8, 25),           # Jump ropes, accessories
-        "Weights": (20, 100),        # Dumbbells vary by weight
-        "Accessories": (5, 60),      # Water bottles to watches
-        "Electronics": (25, 150),    # Fitness trackers, headphones
-        "Apparel": (12, 65),         # Socks to hoodies
-        "Swimming": (8, 35),         # Caps cheap, goggles moderate
-        "Cycling": (15, 80),         # Accessories to helmets
-        "Nutrition": (10, 45),       # Bars to protein powder
-    }
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
     
+    from simulation.inventory import PRODUCT_CATALOG
+    return PRODUCT_CATALOG
+
+def _sync_catalog(db: Session, product_catalog):
+    """
+    Create products from the simulation catalog that aren't in the database yet,
+    with realistic Decathlon pricing. Returns (created, skipped).
+    """
     created_count = 0
-    updated_count = 0
     skipped_count = 0
     
-    for catalog_product in PRODUCT_CATALOG:
+    # SKUs already in the database, looked up in one query
+    existing_skus = set(db.scalars(
+        select(Product.sku).where(Product.sku.in_([p.sku for p in product_catalog]))
+    ))
+    # New products as plain rows, inserted in one executemany
+    new_products = []
+    
+    for catalog_product in product_catalog:
         # Check if product already exists by SKU
-        existing = db.query(Product).filter(Product.sku == catalog_product.sku).first()
-        
-        if existing:
+        if catalog_product.sku in existing_skus:
             skipped_count += 1
             continue
+        existing_skus.add(catalog_product.sku)
         
         # Get price range for category
-        price_min, price_max = category_pricing.get(catalog_product.category, (10, 50))
+        price_min, price_max = _CATEGORY_PRICING.get(catalog_product.category, (10, 50))
         unit_price = round(random.uniform(price_min, price_max), 2)
         
         # Calculate stock thresholds based on price (expensive items = lower stock)
@@ -358,28 +486,81 @@ def sync_products_from_simulation_catalog(db: Session = Depends(get_db)):
             optimal_stock = random.randint(15, 30)
         
         # Create product
-        product = Product(
-            sku=catalog_product.sku,
-            name=catalog_product.name,
-            category=catalog_product.category,
-            unit_price=unit_price,
-            reorder_threshold=reorder_threshold,
-            optimal_stock_level=optimal_stock
-        )
-        
-        db.add(product)
+        new_products.append({
+            'sku': catalog_product.sku,
+            'name': catalog_product.name,
+            'category': catalog_product.category,
+            'unit_price': unit_price,
+            'reorder_threshold': reorder_threshold,
+            'optimal_stock_level': optimal_stock
+        })
         created_count += 1
     
+    if new_products:
+        db.execute(Product.__table__.insert(), new_products)
     db.commit()
     
+    logger.info("Synced product catalog: %d created, %d skipped", created_count, skipped_count)
+    
+    return created_count, skipped_count
+
+def _run_catalog_sync(mode, product_catalog):
+    """Background task: sync the catalog on its own session for `mode`"""
+    if not _catalog_sync_lock.acquire(blocking=False):
+        logger.info("Catalog sync already running - skipping")
+        return
+    _catalog_sync_status.update(running=True, message="Catalog sync in progress")
+    db = new_session(mode)
+    try:
+        created, skipped = _sync_catalog(db, product_catalog)
+        _catalog_sync_status.update(
+            message="Synced simulation product catalog to database",
+            created=created,
+            skipped=skipped,
+            total_catalog_size=len(product_catalog)
+        )
+    except Exception as e:
+        db.rollback()
+        logger.exception("Catalog sync failed")
+        _catalog_sync_status.update(message=f"Catalog sync failed: {e}", created=0, skipped=0)
+    finally:
+        db.close()
+        _catalog_sync_status["running"] = False
+        _catalog_sync_lock.release()
+
+@router.post("/sync-from-catalog", status_code=202)
+def sync_products_from_simulation_catalog(background_tasks: BackgroundTasks):
+    """
+    Sync products from simulation PRODUCT_CATALOG to database.
+    Creates products with realistic Decathlon pricing if they don't exist.
+    This ensures simulation and analytics use the same product catalog.
+    
+    The catalog is loaded before responding (so import errors still return 500);
+    the inserts run as a background task after the 202 response is sent.
+    Poll GET /products/sync-from-catalog/status for the result counts.
+    """
+    try:
+        product_catalog = _product_catalog()
+    except Exception as e:
+        # Import errors, or the simulation config failing to load in this environment
+        raise HTTPException(status_code=500, detail=f"Failed to import simulation catalog: {str(e)}")
+    
+    if _catalog_sync_lock.locked():
+        return {"success": True, "status": "running", "message": "Catalog sync already in progress"}
+    
+    background_tasks.add_task(_run_catalog_sync, config_state.mode, product_catalog)
     return {
         "success": True,
-        "message": f"Synced simulation product catalog to database",
-        "created": created_count,
-        "skipped": skipped_count,
-        "total_catalog_size": len(PRODUCT_CATALOG)
+        "status": "queued",
+        "message": "Syncing simulation product catalog to database",
+        "total_catalog_size": len(product_catalog)
     }
 
+@router.get("/sync-from-catalog/status")
+def get_catalog_sync_status():
+    """Get the status and result counts of the last catalog sync"""
+    return dict(_catalog_sync_status)
+
 @router.delete("/cleanup-generic")
 def cleanup_generic_products(db: Session = Depends(get_db)):
     """
@@ -389,7 +570,6 @@ def cleanup_generic_products(db: Session = Depends(get_db)):
     These products are created by the old auto-creation logic and should be removed
     to clean up the product catalog.
     """
-    from ..models import InventoryItem
     
     # Find generic products by pattern
     generic_products = db.query(Product).filter(
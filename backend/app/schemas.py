@@ -20,6 +20,25 @@ class DataPacket(BaseModel):
     detections: List[DetectionInput]
     uwb_measurements: List[UWBMeasurementInput]
 
+# Bulk ingestion schemas (simulation firehose)
+class BulkDetectionInput(BaseModel):
+    product_id: str  # RFID tag
+    product_name: Optional[str] = None
+    x_position: Optional[float] = None
+    y_position: Optional[float] = None
+    status: Optional[str] = "present"  # "present" or "missing"
+
+class BulkDetectionPacket(BaseModel):
+    detections: List[BulkDetectionInput] = []
+
+class BulkUWBInput(BaseModel):
+    mac_address: str
+    distance_cm: float
+    status: Optional[str] = "0x01"
+
+class BulkUWBPacket(BaseModel):
+    measurements: List[BulkUWBInput] = []
+
 class DetectionResponse(BaseModel):
     id: int
     timestamp: Optional[str] = None
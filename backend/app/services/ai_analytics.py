@@ -432,8 +432,8 @@ class AIAnalyticsService:
                 support = count / total_baskets
                 
                 # Get product names
-                prod1 = self.db.query(Product).filter(Product.id == prod1_id).first()
-                prod2 = self.db.query(Product).filter(Product.id == prod2_id).first()
+                prod1 = self.db.get(Product, prod1_id)
+                prod2 = self.db.get(Product, prod2_id)
                 
                 if prod1 and prod2:
                     frequent_pairs.append({
@@ -0,0 +1,71 @@
+"""
+Active Anchor Cache
+===================
+Anchor positions change rarely (admin edits through the anchors router) but
+are needed for every UWB packet. This service keeps the active anchors of each
+database in memory for a short TTL, already laid out for triangulation:
+
+- index_by_mac: MAC address -> row in `positions`
+- positions: (K, 2) float64 array of anchor coordinates
+
+The anchors router invalidates the cache on every write, so the TTL only
+bounds staleness for changes made outside the API (e.g. manual SQL).
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..models import Anchor
+
+
+@dataclass(frozen=True)
+class AnchorSet:
+    """Active anchors of one database, in lookup + structure-of-arrays form"""
+    index_by_mac: Dict[str, int]
+    positions: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.index_by_mac)
+
+
+class AnchorCache:
+    """Per-database TTL cache of active anchors"""
+
+    TTL_SECONDS = 60.0
+
+    def __init__(self):
+        # engine -> (expires_at, anchors)
+        self._entries: Dict[object, Tuple[float, AnchorSet]] = {}
+
+    def get(self, db: Session) -> AnchorSet:
+        """Active anchors for the session's database, loading them on a miss"""
+        key = db.get_bind()
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        rows = db.query(Anchor.mac_address, Anchor.x_position, Anchor.y_position)\
+            .filter(Anchor.is_active == True)\
+            .order_by(Anchor.id)\
+            .all()
+        anchors = AnchorSet(
+            index_by_mac={row.mac_address: i for i, row in enumerate(rows)},
+            positions=np.array(
+                [(row.x_position, row.y_position) for row in rows], dtype=np.float64
+            ).reshape(-1, 2)
+        )
+        self._entries[key] = (now + self.TTL_SECONDS, anchors)
+        return anchors
+
+    def invalidate(self):
+        """Drop all cached anchors (call after any anchor write)"""
+        self._entries.clear()
+
+
+# Global instance
+anchor_cache = AnchorCache()
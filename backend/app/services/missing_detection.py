@@ -24,6 +24,7 @@ Key principles:
 - Simulation mode: Items marked missing immediately when not detected (simulation controls disappearance)
 """
 
+import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Optional, Set
 from sqlalchemy.orm import Session
@@ -62,6 +63,7 @@ class MissingItemDetector:
     # if they're within 50cm (well inside simulation's range). This avoids
     # false positives at the boundary due to floating point differences.
     RFID_DETECTION_RANGE_CM = 50.0  # 50cm - inner zone for reliable detection
+    RFID_DETECTION_RANGE_CM_SQ = RFID_DETECTION_RANGE_CM * RFID_DETECTION_RANGE_CM  # Compared against squared distances
     
     # === PRODUCTION-SPECIFIC PARAMETERS ===
     # Consecutive misses needed (longer - hardware can be flaky)
@@ -81,13 +83,15 @@ class MissingItemDetector:
         detected_rfid_tags: Dict[str, float],  # {rfid_tag: rssi_dbm}
         employee_x: float,
         employee_y: float,
-        timestamp: datetime
+        timestamp: datetime,
+        mode: Optional[ConfigMode] = None
     ) -> List[InventoryItem]:
         """
         Process RFID detections and infer missing items.
-        Dispatches to mode-specific algorithm.
+        Dispatches to the algorithm for `mode` (default: the current mode).
+        Changes are flushed, not committed - the caller owns the transaction.
         """
-        current_mode = config_state.mode
+        current_mode = mode if mode is not None else config_state.mode
         
         if current_mode == ConfigMode.SIMULATION:
             return cls._process_detections_simulation(
@@ -148,19 +152,16 @@ class MissingItemDetector:
         
         # Now check previously-seen items for missing status
         for item in present_items:
-            tag_short = item.rfid_tag[-8:]
-            
             # Skip if already detected above
             if item.rfid_tag in detected_tags_set:
                 continue
             
-            # Calculate distance to employee
-            distance = cls._calculate_distance(
-                item.x_position, item.y_position,
-                employee_x, employee_y
-            )
+            # Compare squared distance to employee (no sqrt for items out of range)
+            dx = item.x_position - employee_x
+            dy = item.y_position - employee_y
+            distance_sq = dx * dx + dy * dy
             
-            if distance <= cls.RFID_DETECTION_RANGE_CM:
+            if distance_sq <= cls.RFID_DETECTION_RANGE_CM_SQ:
                 # Item was seen before, is within range, but NOT in packet = MISSING
                 items_in_range += 1
                 
@@ -168,22 +169,25 @@ class MissingItemDetector:
                 if len(newly_missing) >= cls.MAX_MISSING_PER_SCAN:
                     continue
                 
+                distance = math.sqrt(distance_sq)
+                tag_short = item.rfid_tag[-8:]
                 item.status = 'not present'
                 item.consecutive_misses = 0
                 item.first_miss_at = None
                 newly_missing.append(item)
-                logger.info(f"   📦❌ {tag_short}: MISSING (not in packet at {distance:.1f}cm)")
+                logger.info("   📦❌ %s: MISSING (not in packet at %.1fcm)", tag_short, distance)
         
-        db.commit()
+        db.flush()
         
         # Periodic logging
         import random
         if random.random() < 0.05 or newly_missing:
-            logger.info(f"🔍 [SIMULATION] Employee at ({employee_x:.1f}, {employee_y:.1f}): "
-                       f"{len(detected_tags_set)} in packet, {items_in_range} previously-seen in range (not detected)")
+            logger.info("🔍 [SIMULATION] Employee at (%.1f, %.1f): "
+                        "%d in packet, %d previously-seen in range (not detected)",
+                        employee_x, employee_y, len(detected_tags_set), items_in_range)
         
         if newly_missing:
-            logger.info(f"🧮 [SIMULATION] Marked {len(newly_missing)} item(s) as 'not present'")
+            logger.info("🧮 [SIMULATION] Marked %d item(s) as 'not present'", len(newly_missing))
         
         return newly_missing
     
@@ -213,24 +217,25 @@ class MissingItemDetector:
             InventoryItem.status == 'present'
         ).all()
         
-        present_rfid_tags = {item.rfid_tag for item in present_items}
-        
-        logger.info(f"🔍 [PRODUCTION] Processing {len(detected_rfid_tags)} detected tags, {len(present_items)} present items")
-        logger.info(f"   📋 Detected RFIDs: {[tag[-8:] for tag in detected_tags_set]}")
-        logger.info(f"   📦 Present in DB: {[tag[-8:] for tag in present_rfid_tags]}")
+        logger.info("🔍 [PRODUCTION] Processing %d detected tags, %d present items",
+                    len(detected_rfid_tags), len(present_items))
+        if logger.isEnabledFor(logging.INFO):
+            present_rfid_tags = {item.rfid_tag for item in present_items}
+            logger.info("   📋 Detected RFIDs: %s", [tag[-8:] for tag in detected_tags_set])
+            logger.info("   📦 Present in DB: %s", [tag[-8:] for tag in present_rfid_tags])
         
         # SAFETY CHECK: Must detect at least MIN_DETECTED_TO_CHECK_MISSING items
         if len(detected_rfid_tags) < cls.MIN_DETECTED_TO_CHECK_MISSING:
-            logger.info(f"   ⏸️  Only {len(detected_rfid_tags)} item(s) detected (need {cls.MIN_DETECTED_TO_CHECK_MISSING}+) - NOT checking for missing")
+            logger.info("   ⏸️  Only %d item(s) detected (need %d+) - NOT checking for missing", len(detected_rfid_tags), cls.MIN_DETECTED_TO_CHECK_MISSING)
             # Still update detected items to reset their miss counters
             for item in present_items:
                 if item.rfid_tag in detected_tags_set:
                     rssi = detected_rfid_tags[item.rfid_tag]
                     cls._handle_item_detected(item, rssi, timestamp)
-            db.commit()
+            db.flush()
             return newly_missing
         
-        logger.info(f"   ✅ {len(detected_rfid_tags)} items detected - actively scanning, will check for missing")
+        logger.info("   ✅ %d items detected - actively scanning, will check for missing", len(detected_rfid_tags))
         
         # Process each present item
         for item in present_items:
@@ -242,29 +247,30 @@ class MissingItemDetector:
                 old_misses = item.consecutive_misses or 0
                 cls._handle_item_detected(item, rssi, timestamp)
                 if old_misses > 0:
-                    logger.info(f"   ✅ {tag_short}: DETECTED (RSSI={rssi:.0f}dBm) - reset misses from {old_misses} to 0")
+                    logger.info("   ✅ %s: DETECTED (RSSI=%.0fdBm) - reset misses from %s to 0", tag_short, rssi, old_misses)
             else:
                 # Item NOT detected - increment miss counter
                 old_misses = item.consecutive_misses or 0
                 should_mark_missing = cls._handle_item_missed_production(item, timestamp)
                 
-                logger.info(f"   ❌ {tag_short}: NOT DETECTED - miss count: {old_misses} → {item.consecutive_misses}/{cls.MIN_CONSECUTIVE_MISSES_PRODUCTION}")
+                logger.info("   ❌ %s: NOT DETECTED - miss count: %d → %d/%d",
+                            tag_short, old_misses, item.consecutive_misses, cls.MIN_CONSECUTIVE_MISSES_PRODUCTION)
                 
                 if should_mark_missing:
                     if len(newly_missing) >= cls.MAX_MISSING_PER_SCAN:
-                        logger.info(f"   ⚠️  {tag_short}: Would be marked missing but max per scan reached")
+                        logger.info("   ⚠️  %s: Would be marked missing but max per scan reached", tag_short)
                         continue
                     
                     item.status = 'not present'
                     newly_missing.append(item)
-                    logger.info(f"   📦❌ {tag_short}: MARKED AS MISSING after {item.consecutive_misses} consecutive misses")
+                    logger.info("   📦❌ %s: MARKED AS MISSING after %s consecutive misses", tag_short, item.consecutive_misses)
                     item.consecutive_misses = 0
                     item.first_miss_at = None
         
-        db.commit()
+        db.flush()
         
         if newly_missing:
-            logger.info(f"🧮 [PRODUCTION] Marked {len(newly_missing)} item(s) as 'not present'")
+            logger.info("🧮 [PRODUCTION] Marked %d item(s) as 'not present'", len(newly_missing))
         
         return newly_missing
     
@@ -5,10 +5,18 @@ import math
 from typing import List, Tuple, Optional
 from datetime import datetime
 
+import numpy as np
+
+from .core import logger
+
 class TriangulationService:
     """
     Calculates 2D position of a tag based on distance measurements from multiple anchors
     Uses trilateration algorithm (geometric intersection of circles)
+    
+    The math runs on structure-of-arrays inputs: anchor coordinates as a (K, 2)
+    array and distances as a (K,) array. calculate_position() keeps accepting
+    the list of (anchor_x, anchor_y, distance) tuples used by older callers.
     """
     
     @staticmethod
@@ -20,33 +28,62 @@ class TriangulationService:
         
         Args:
             measurements: List of (anchor_x, anchor_y, distance) tuples
-            
+        
         Returns:
             Tuple of (x, y, confidence) or None if calculation fails
-            
+        """
+        if len(measurements) < 2:
+            return None
+        
+        data = np.asarray(measurements, dtype=np.float64)
+        return TriangulationService.calculate_position_arrays(data[:, :2], data[:, 2])
+    
+    @staticmethod
+    def calculate_position_arrays(
+        anchor_xy: np.ndarray,
+        distances: np.ndarray
+    ) -> Optional[Tuple[float, float, float]]:
+        """
+        Calculate tag position from array inputs
+        
+        Args:
+            anchor_xy: (K, 2) array of anchor coordinates
+            distances: (K,) array of measured distances to each anchor
+        
+        Returns:
+            Tuple of (x, y, confidence) or None if calculation fails
+        
         Algorithm:
         - With 2 anchors: Returns midpoint (low confidence)
         - With 3+ anchors: Uses least-squares trilateration
         """
-        if len(measurements) < 2:
+        # float64 on purpose: the linearized system squares cm-scale coordinates
+        anchor_xy = np.asarray(anchor_xy, dtype=np.float64)
+        distances = np.asarray(distances, dtype=np.float64)
+        
+        if len(distances) < 2:
             return None
         
-        if len(measurements) == 2:
+        if len(distances) == 2:
             # With 2 anchors, we can only estimate the midpoint
-            return TriangulationService._two_anchor_position(measurements)
+            return TriangulationService._two_anchor_position(anchor_xy, distances)
         
         # With 3+ anchors, use proper trilateration
-        return TriangulationService._multilateration(measurements)
+        return TriangulationService._multilateration(anchor_xy, distances)
     
     @staticmethod
     def _two_anchor_position(
-        measurements: List[Tuple[float, float, float]]
+        anchor_xy: np.ndarray,
+        distances: np.ndarray
     ) -> Tuple[float, float, float]:
         """
         Calculate approximate position with only 2 anchors
         Returns the midpoint between the two circles (low confidence)
         """
-        (x1, y1, r1), (x2, y2, r2) = measurements[0], measurements[1]
+        # Two points - plain float math is cheaper than array ops here
+        x1, y1 = float(anchor_xy[0, 0]), float(anchor_xy[0, 1])
+        x2, y2 = float(anchor_xy[1, 0]), float(anchor_xy[1, 1])
+        r1, r2 = float(distances[0]), float(distances[1])
         
         # Distance between anchors
         d = math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
@@ -76,103 +113,77 @@ class TriangulationService:
     
     @staticmethod
     def _multilateration(
-        measurements: List[Tuple[float, float, float]]
+        anchor_xy: np.ndarray,
+        distances: np.ndarray
     ) -> Tuple[float, float, float]:
         """
         Calculate position using 3+ anchors with least-squares method
         More accurate and provides better confidence scores
         """
-        n = len(measurements)
-        
-        # Set up matrices for least squares: Ax = b
-        # We'll solve for (x, y) position
-        A = []
-        b = []
-        
-        # Use first anchor as reference point
-        x1, y1, r1 = measurements[0]
-        
-        for i in range(1, n):
-            xi, yi, ri = measurements[i]
-            
-            # Linear equation derived from:
-            # (x - x1)^2 + (y - y1)^2 - r1^2 = (x - xi)^2 + (y - yi)^2 - ri^2
-            A.append([2 * (xi - x1), 2 * (yi - y1)])
-            b.append(
-                xi**2 - x1**2 + yi**2 - y1**2 - ri**2 + r1**2
-            )
+        # Use first anchor as reference point. Each row is the linear equation
+        # derived from:
+        # (x - x1)^2 + (y - y1)^2 - r1^2 = (x - xi)^2 + (y - yi)^2 - ri^2
+        ref_xy = anchor_xy[0]
+        ref_r = distances[0]
+        others_xy = anchor_xy[1:]
+        others_r = distances[1:]
+        
+        A = 2.0 * (others_xy - ref_xy)
+        b = (
+            np.sum(others_xy * others_xy, axis=1) - np.dot(ref_xy, ref_xy)
+            - others_r * others_r + ref_r * ref_r
+        )
         
         # Solve using least squares
         try:
             x, y = TriangulationService._least_squares(A, b)
             
             # Calculate confidence based on residual error
-            confidence = TriangulationService._calculate_confidence(x, y, measurements)
+            confidence = TriangulationService._calculate_confidence(x, y, anchor_xy, distances)
             
             return (x, y, confidence)
         
         except Exception as e:
-            print(f"Trilateration failed: {e}")
+            logger.warning("Trilateration failed: %s", e)
             # Fallback to centroid
-            x = sum(m[0] for m in measurements) / n
-            y = sum(m[1] for m in measurements) / n
-            return (x, y, 0.2)  # Very low confidence
+            x, y = anchor_xy.mean(axis=0)
+            return (float(x), float(y), 0.2)  # Very low confidence
     
     @staticmethod
-    def _least_squares(A: List[List[float]], b: List[float]) -> Tuple[float, float]:
+    def _least_squares(A: np.ndarray, b: np.ndarray) -> Tuple[float, float]:
         """
         Solve Ax = b using least squares method
         For 2D position: x = [x_pos, y_pos]
         """
-        # Convert to numpy-like calculations without numpy
-        # For 2x2 case, we can solve directly
-        
-        # A^T * A
-        n = len(A)
-        m = len(A[0])  # Should be 2
+        # Normal equations: (A^T A) x = A^T b, a 2x2 system solved directly
+        ATA = A.T @ A
+        ATb = A.T @ b
         
-        ATA = [[0.0] * m for _ in range(m)]
-        for i in range(m):
-            for j in range(m):
-                for k in range(n):
-                    ATA[i][j] += A[k][i] * A[k][j]
-        
-        # A^T * b
-        ATb = [0.0] * m
-        for i in range(m):
-            for k in range(n):
-                ATb[i] += A[k][i] * b[k]
-        
-        # Solve 2x2 system: ATA * x = ATb
-        det = ATA[0][0] * ATA[1][1] - ATA[0][1] * ATA[1][0]
+        det = ATA[0, 0] * ATA[1, 1] - ATA[0, 1] * ATA[1, 0]
         
         if abs(det) < 1e-10:
             raise ValueError("Singular matrix")
         
-        x = (ATA[1][1] * ATb[0] - ATA[0][1] * ATb[1]) / det
-        y = (ATA[0][0] * ATb[1] - ATA[1][0] * ATb[0]) / det
+        x = (ATA[1, 1] * ATb[0] - ATA[0, 1] * ATb[1]) / det
+        y = (ATA[0, 0] * ATb[1] - ATA[1, 0] * ATb[0]) / det
         
-        return (x, y)
+        return (float(x), float(y))
     
     @staticmethod
     def _calculate_confidence(
-        x: float, 
-        y: float, 
-        measurements: List[Tuple[float, float, float]]
+        x: float,
+        y: float,
+        anchor_xy: np.ndarray,
+        distances: np.ndarray
     ) -> float:
         """
         Calculate confidence score (0-1) based on how well the position
         fits all the distance measurements
         """
-        errors = []
-        
-        for anchor_x, anchor_y, distance in measurements:
-            calculated_dist = math.sqrt((x - anchor_x)**2 + (y - anchor_y)**2)
-            error = abs(calculated_dist - distance)
-            errors.append(error)
+        calculated_dist = np.hypot(anchor_xy[:, 0] - x, anchor_xy[:, 1] - y)
         
         # Average error in cm
-        avg_error = sum(errors) / len(errors)
+        avg_error = float(np.mean(np.abs(calculated_dist - distances)))
         
         # Convert to confidence (exponential decay)
         # Error of 0cm = 1.0 confidence
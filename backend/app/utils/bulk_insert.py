@@ -0,0 +1,51 @@
+"""
+Bulk Row Insertion
+
+Fast path for append-only telemetry tables (detections, UWB measurements).
+On PostgreSQL rows are streamed with COPY FROM STDIN, which is much faster
+than INSERT even with executemany; other databases use a Core executemany.
+"""
+import io
+from typing import Any, List
+
+from sqlalchemy.orm import Session
+
+
+def _copy_value(value: Any) -> str:
+    """Encode one field in COPY text format (NULL is \\N, control characters escaped)"""
+    if value is None:
+        return "\\N"
+    return str(value)\
+        .replace("\\", "\\\\")\
+        .replace("\t", "\\t")\
+        .replace("\n", "\\n")\
+        .replace("\r", "\\r")
+
+
+def insert_rows(db: Session, model, rows: List[dict]) -> None:
+    """
+    Insert plain row mappings (all with the same keys) into `model`'s table
+    inside the session's current transaction.
+    """
+    if not rows:
+        return
+
+    if db.get_bind().dialect.name != "postgresql":
+        # Table-level insert: a plain Core executemany, bypassing the ORM bulk-insert path
+        db.execute(model.__table__.insert(), rows)
+        return
+
+    columns = list(rows[0].keys())
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(row[column]) for column in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    # Raw DBAPI (psycopg2) cursor on the session's connection, so COPY joins the transaction
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f'COPY "{model.__tablename__}" ({column_list}) FROM STDIN', buffer)
+    finally:
+        cursor.close()
@@ -6,6 +6,7 @@ At scale, this would be replaced by API calls to Decathlon's product database.
 For the demo environment with 26 RFID tags, a local CSV is sufficient.
 """
 import csv
+from functools import cached_property
 from pathlib import Path
 from typing import Dict, Optional
 from dataclasses import dataclass
@@ -22,6 +23,13 @@ class ProductMetadata:
     price_chf: float
     gtin: str
     serial_number: str
+    
+    @cached_property
+    def display_name(self) -> str:
+        """Name with size/color (e.g., "Hiking Jacket - Size M - Black"), formatted once"""
+        if self.size and self.size.lower() != 'onesize':
+            return f"{self.name} - Size {self.size} - {self.color}"
+        return f"{self.name} - {self.color}"
 
 
 class EPCLookup:
@@ -99,10 +107,7 @@ class EPCLookup:
             return f"Demo Item {epc[:8]}"
         
         if include_details:
-            if metadata.size and metadata.size.lower() != 'onesize':
-                return f"{metadata.name} - Size {metadata.size} - {metadata.color}"
-            else:
-                return f"{metadata.name} - {metadata.color}"
+            return metadata.display_name
         
         return metadata.name
 
@@ -0,0 +1,55 @@
+"""
+Streaming JSON Responses
+
+Serializes large query results to a JSON array chunk by chunk with orjson,
+so list endpoints never hold the full result set (ORM objects, dicts and the
+encoded body) in memory at once.
+"""
+from typing import Any, Callable, Iterator
+
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+# Rows fetched from the database (and encoded) per chunk
+STREAM_CHUNK_SIZE = 500
+
+
+def iter_json_array(
+    db: Session,
+    statement: Select,
+    row_to_dict: Callable[[Any], dict],
+    chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Execute `statement` with a server-side cursor and yield the rows as an
+    encoded JSON array, one chunk of rows at a time.
+    Closes `db` when the iteration finishes.
+    """
+    try:
+        result = db.execute(statement.execution_options(yield_per=chunk_size))
+        separator = b"["
+        for rows in result.partitions():
+            chunk = bytearray()
+            for row in rows:
+                chunk += separator
+                chunk += orjson.dumps(row_to_dict(row))
+                separator = b","
+            yield bytes(chunk)
+        yield b"]" if separator == b"," else b"[]"
+    finally:
+        db.close()
+
+
+def stream_json_array(
+    db: Session,
+    statement: Select,
+    row_to_dict: Callable[[Any], dict],
+    chunk_size: int = STREAM_CHUNK_SIZE
+) -> StreamingResponse:
+    """Wrap iter_json_array in a JSON StreamingResponse"""
+    return StreamingResponse(
+        iter_json_array(db, statement, row_to_dict, chunk_size),
+        media_type="application/json"
+    )
@@ -2,87 +2,248 @@
 WebSocket Manager for Real-time Data Broadcasting
 ==================================================
 Broadcasts position updates and detection events to connected clients.
+
+Broadcasts are queued by the ingestion endpoints and sent by a single
+background worker, so a slow or stalled client can never hold up a
+`/data` request or its database transaction. Messages queued within one
+batch window reach each client as a single "batch" frame.
 """
-from typing import List, Set
+from typing import Dict, List, Set, Optional
 from fastapi import WebSocket
-import json
 import asyncio
+import orjson
 from .core import logger
 
 
 class ConnectionManager:
     """Manages WebSocket connections and broadcasts"""
-    
+
+    # Maximum number of messages waiting to be broadcast
+    QUEUE_MAXSIZE = 1024
+    # How long the worker keeps collecting messages after the first one arrives
+    BATCH_WINDOW_SECONDS = 0.05
+    # Number of clients written to before yielding back to the event loop
+    SEND_GROUP_SIZE = 50
+
     def __init__(self):
         self.active_connections: Set[WebSocket] = set()
-    
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
     async def connect(self, websocket: WebSocket):
         """Accept new WebSocket connection"""
         await websocket.accept()
         self.active_connections.add(websocket)
-        logger.info(f"WebSocket client connected. Total connections: {len(self.active_connections)}")
-    
+        logger.info("WebSocket client connected. Total connections: %d", len(self.active_connections))
+
     def disconnect(self, websocket: WebSocket):
         """Remove WebSocket connection"""
         self.active_connections.discard(websocket)
-        logger.info(f"WebSocket client disconnected. Total connections: {len(self.active_connections)}")
-    
+        logger.info("WebSocket client disconnected. Total connections: %d", len(self.active_connections))
+
+    def start(self):
+        """Start the background broadcast worker (call from a running event loop)"""
+        if self._worker_task is not None and not self._worker_task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.QUEUE_MAXSIZE)
+        self._worker_task = asyncio.create_task(self._broadcast_worker())
+        logger.info("WebSocket broadcast worker started")
+
+    async def stop(self):
+        """Stop the background broadcast worker"""
+        if self._worker_task is None:
+            return
+        self._worker_task.cancel()
+        try:
+            await self._worker_task
+        except asyncio.CancelledError:
+            pass
+        self._worker_task = None
+        self._queue = None
+        self._loop = None
+        logger.info("WebSocket broadcast worker stopped")
+
+    def enqueue(self, message: dict):
+        """
+        Queue a message for broadcasting without waiting for clients.
+        If the queue is full the oldest message is dropped - live views only
+        care about the most recent state.
+        Safe to call from sync endpoints running in the threadpool.
+        """
+        if not self.active_connections:
+            return
+
+        loop = self._loop
+        if self._queue is None or loop is None:
+            logger.warning("Broadcast worker not running - dropping message")
+            return
+
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+
+        if on_loop:
+            self._put(message)
+        else:
+            # asyncio.Queue is not thread-safe - hand the message to the event loop
+            try:
+                loop.call_soon_threadsafe(self._put, message)
+            except RuntimeError:
+                logger.warning("Event loop closed - dropping message")
+
+    def _put(self, message: dict):
+        """Add a message to the queue, dropping the oldest one if it is full (event loop only)"""
+        if self._queue is None:
+            return
+
+        if self._queue.full():
+            try:
+                self._queue.get_nowait()
+                logger.warning("Broadcast queue full - dropped oldest message")
+            except asyncio.QueueEmpty:
+                pass
+        self._queue.put_nowait(message)
+
+    async def _broadcast_worker(self):
+        """Drain the queue, merging messages that arrive within one batch window"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.BATCH_WINDOW_SECONDS
+
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            messages = self._merge_batch(batch)
+            if len(messages) > 1:
+                # One frame per client instead of one per message type
+                message = {"type": "batch", "data": {"messages": messages}}
+            else:
+                message = messages[0]
+            try:
+                await self.broadcast(message)
+            except Exception as e:
+                logger.warning("Broadcast worker failed to send %s: %s", message.get('type', 'unknown'), e)
+
+    @staticmethod
+    def _merge_batch(batch: List[dict]) -> List[dict]:
+        """
+        Merge messages of the same type within one batch (clients handle each
+        type independently, so ordering across types does not matter):
+        - position_update: only the latest one matters
+        - item_update: item lists are concatenated (later entries win on the client)
+        - missing_update: deltas are folded in order into one added/removed pair
+        - anything else is sent unchanged
+        """
+        merged: Dict[str, dict] = {}
+        passthrough: List[dict] = []
+        missing_added: Optional[Dict[str, dict]] = None
+        missing_removed: Dict[str, None] = {}
+        for message in batch:
+            message_type = message.get("type")
+            if message_type == "missing_update":
+                if missing_added is None:
+                    missing_added = {}
+                for tag in message["data"]["removed"]:
+                    missing_added.pop(tag, None)
+                    missing_removed[tag] = None
+                for item in message["data"]["added"]:
+                    missing_removed.pop(item["rfid_tag"], None)
+                    missing_added[item["rfid_tag"]] = item
+            elif message_type == "item_update" and message_type in merged:
+                items = merged[message_type]["data"]["items"] + message["data"]["items"]
+                merged[message_type] = {
+                    "type": "item_update",
+                    "data": {"items": items, "count": len(items)}
+                }
+            elif message_type in ("position_update", "item_update"):
+                merged[message_type] = message
+            else:
+                passthrough.append(message)
+        if missing_added is not None:
+            merged["missing_update"] = {
+                "type": "missing_update",
+                "data": {"added": list(missing_added.values()), "removed": list(missing_removed)}
+            }
+        return list(merged.values()) + passthrough
+
     async def broadcast(self, message: dict):
         """Broadcast message to all connected clients"""
         if not self.active_connections:
             logger.debug("No active WebSocket connections to broadcast to")
             return
-        
-        message_json = json.dumps(message)
+
+        # Serialize once and reuse the same payload for every client
+        await self.broadcast_bytes(orjson.dumps(message), message.get('type', 'unknown'))
+
+    async def broadcast_bytes(self, payload: bytes, label: str = "message"):
+        """Send an already-encoded JSON payload to all connected clients"""
+        if not self.active_connections:
+            return
+
         disconnected = set()
-        
-        logger.info(f"📡 Broadcasting {message.get('type', 'unknown')} to {len(self.active_connections)} clients")
-        
-        for connection in self.active_connections:
+        connections = list(self.active_connections)
+
+        logger.info("📡 Broadcasting %s to %d clients", label, len(connections))
+
+        for i, connection in enumerate(connections):
             try:
-                await connection.send_text(message_json)
+                await connection.send_bytes(payload)
             except Exception as e:
-                logger.warning(f"Failed to send to client: {e}")
+                logger.warning("Failed to send to client: %s", e)
                 disconnected.add(connection)
-        
+
+            # Yield between groups so large fan-outs don't starve other tasks
+            if (i + 1) % self.SEND_GROUP_SIZE == 0:
+                await asyncio.sleep(0)
+
         # Clean up disconnected clients
         for connection in disconnected:
             self.disconnect(connection)
-    
-    async def broadcast_position_update(self, position_data: dict):
-        """Broadcast employee position update"""
-        await self.broadcast({
+
+    def broadcast_position_update(self, position_data: dict):
+        """Queue employee position update"""
+        self.enqueue({
             "type": "position_update",
             "data": position_data
         })
-    
-    async def broadcast_detection_update(self, detections: List[dict]):
-        """Broadcast RFID detection updates"""
-        await self.broadcast({
+
+    def broadcast_detection_update(self, detections: List[dict]):
+        """Queue RFID detection updates"""
+        self.enqueue({
             "type": "detection_update",
             "data": {
                 "detections": detections,
                 "count": len(detections)
             }
         })
-    
-    async def broadcast_item_update(self, items: List[dict]):
-        """Broadcast inventory item updates (with positions)"""
-        await self.broadcast({
+
+    def broadcast_item_update(self, items: List[dict]):
+        """Queue inventory item updates (with positions)"""
+        self.enqueue({
             "type": "item_update",
             "data": {
                 "items": items,
                 "count": len(items)
             }
         })
-    
-    async def broadcast_missing_update(self, missing_items: List[dict]):
-        """Broadcast missing items list update"""
-        await self.broadcast({
+
+    def broadcast_missing_update(self, added: List[dict], removed: List[str]):
+        """Queue a missing items delta: newly missing items and restored RFID tags"""
+        self.enqueue({
             "type": "missing_update",
             "data": {
-                "missing_items": missing_items,
-                "count": len(missing_items)
+                "added": added,
+                "removed": removed
             }
         })
 
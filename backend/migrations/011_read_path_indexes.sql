@@ -0,0 +1,16 @@
+-- OptiFlow Read Path Indexes
+-- Version: 011
+-- Description: Partial indexes for the live map and missing-items endpoints
+-- detections/uwb_measurements already have a B-tree index on timestamp, which
+-- PostgreSQL scans backwards for ORDER BY timestamp DESC LIMIT N, so no
+-- separate DESC index is needed there.
+
+-- /data/items: only items with a known position are drawn on the map
+CREATE INDEX IF NOT EXISTS idx_inventory_items_positioned
+ON inventory_items(id)
+WHERE x_position IS NOT NULL AND y_position IS NOT NULL;
+
+-- /data/missing and /stats: detected items that are currently not present
+CREATE INDEX IF NOT EXISTS idx_inventory_items_missing
+ON inventory_items(last_seen_at)
+WHERE status = 'not present' AND last_seen_at IS NOT NULL;
@@ -0,0 +1,8 @@
+-- OptiFlow Inventory Product/Status Index
+-- Version: 012
+-- Description: Composite index for per-product stock counts grouped by status
+-- Item detail, product stock summaries and stock adjustments all count
+-- inventory_items by product_id and status; this lets them use an index-only scan.
+
+CREATE INDEX IF NOT EXISTS idx_inventory_items_product_status
+ON inventory_items(product_id, status);
@@ -0,0 +1,11 @@
+-- OptiFlow Detection Product/Timestamp Index
+-- Version: 013
+-- Description: Composite (product_id, timestamp DESC) index on detections
+-- Serves time-bounded, newest-first history for a single tag. Its leading
+-- product_id column also covers plain product_id lookups, so the single-column
+-- index is dropped to keep the number of indexes maintained per insert the same.
+
+CREATE INDEX IF NOT EXISTS idx_detections_product_timestamp
+ON detections(product_id, timestamp DESC);
+
+DROP INDEX IF EXISTS ix_detections_product_id;
@@ -0,0 +1,16 @@
+-- OptiFlow Search Trigram Indexes
+-- Version: 014
+-- Description: pg_trgm GIN indexes for the substring search endpoint
+-- /search/items matches ILIKE '%term%' against product name/SKU and item RFID tags.
+-- A B-tree index cannot serve a leading wildcard; a trigram GIN index can.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_products_name_trgm
+ON products USING GIN (name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_products_sku_trgm
+ON products USING GIN (sku gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_inventory_items_rfid_tag_trgm
+ON inventory_items USING GIN (rfid_tag gin_trgm_ops);
@@ -0,0 +1,12 @@
+-- OptiFlow UWB MAC/Timestamp Index
+-- Version: 015
+-- Description: Composite (mac_address, timestamp DESC) index on uwb_measurements
+-- Serves the latest-measurement-per-anchor lookup in calculate-position, which
+-- partitions by mac_address and takes the newest rows in a recent time window.
+-- Its leading mac_address column also covers plain MAC lookups, so the
+-- single-column index is dropped.
+
+CREATE INDEX IF NOT EXISTS idx_uwb_measurements_mac_timestamp
+ON uwb_measurements(mac_address, timestamp DESC);
+
+DROP INDEX IF EXISTS ix_uwb_measurements_mac_address;
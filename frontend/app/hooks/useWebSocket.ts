@@ -1,11 +1,13 @@
 import { useEffect, useRef, useCallback } from 'react';
 
 interface WebSocketMessage {
-  type: 'position_update' | 'item_update' | 'detection_update';
+  type: 'position_update' | 'item_update' | 'detection_update' | 'missing_update' | 'batch';
   data: any;
   timestamp: string;
 }
 
+const textDecoder = new TextDecoder();
+
 interface UseWebSocketOptions {
   url: string;
   onMessage?: (message: WebSocketMessage) => void;
@@ -58,6 +60,8 @@ export function useWebSocket({
     try {
       console.log(`[WebSocket] Attempting to connect to ${url}...`);
       ws.current = new WebSocket(url);
+      // The backend sends pre-encoded JSON as binary frames
+      ws.current.binaryType = 'arraybuffer';
 
       ws.current.onopen = () => {
         console.log('[WebSocket] ✅ Connection established successfully');
@@ -72,9 +76,14 @@ export function useWebSocket({
 
       ws.current.onmessage = (event) => {
         try {
-          const message: WebSocketMessage = JSON.parse(event.data);
+          const raw = typeof event.data === 'string' ? event.data : textDecoder.decode(event.data);
+          const message: WebSocketMessage = JSON.parse(raw);
           console.log('[WebSocket] 📨 Message received:', message.type, message);
-          onMessageRef.current?.(message);
+          // The backend merges messages queued close together into one batch frame
+          const messages: WebSocketMessage[] = message.type === 'batch' ? message.data.messages : [message];
+          for (const item of messages) {
+            onMessageRef.current?.(item);
+          }
         } catch (error) {
           console.error('[WebSocket] Failed to parse message:', error);
         }
@@ -157,15 +157,21 @@ export default function Home() {
         break;
       
       case 'missing_update':
-        if (message.data && message.data.missing_items) {
-          console.log('[DEBUG] Updating missing items, count:', message.data.count);
-          setMissingItems(message.data.missing_items.map((item: any) => ({
+        if (message.data) {
+          // Delta update: newly missing items and RFID tags restored to present
+          const added = (message.data.added || []).map((item: any) => ({
             product_id: item.rfid_tag,
             product_name: item.product_name,
             x_position: item.x,
             y_position: item.y,
             status: item.status
-          })));
+          }));
+          const changed = new Set<string>([
+            ...(message.data.removed || []),
+            ...added.map((item: any) => item.product_id)
+          ]);
+          console.log('[DEBUG] Missing items delta: +', added.length, '-', (message.data.removed || []).length);
+          setMissingItems(prev => [...prev.filter(item => !changed.has(item.product_id)), ...added]);
         }
         break;
       
@@ -182,6 +188,8 @@ export default function Home() {
     onConnect: () => {
       console.log('WebSocket connected successfully');
       setWsConnected(true);
+      // Missing items arrive as deltas - resync the full list on (re)connect
+      fetchMissingItems();
     },
     onDisconnect: () => {
       console.log('WebSocket disconnected');
@@ -513,6 +521,13 @@ export default function Home() {
   // Removed polling interval - now using WebSocket for real-time updates
   // WebSocket automatically updates positions and items as they arrive
 
+  // Missing items are broadcast as deltas from /data only; periodically resync the
+  // full list to pick up restocks and status edits made through other endpoints
+  useEffect(() => {
+    const interval = setInterval(fetchMissingItems, 30000);
+    return () => clearInterval(interval);
+  }, []);
+
   useEffect(() => {
     if (viewMode === 'stock-heatmap') fetchStockHeatmap();
   }, [viewMode]);
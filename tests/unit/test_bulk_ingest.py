@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Unit tests for bulk RFID ingestion (/data/bulk)
+Runs the endpoint against a temporary SQLite database (the executemany branch
+of the inventory item update) and checks the SQL of the PostgreSQL branch
+
+Run with: pytest tests/unit/test_bulk_ingest.py -v
+Or: pytest -m unit
+"""
+
+import pytest
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+# app.database needs both URLs at import; its engines are never used here
+os.environ.setdefault("DATABASE_URL_SIMULATION", "sqlite://")
+os.environ.setdefault("DATABASE_URL_PRODUCTION", "sqlite://")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.database import get_db
+from app.models import Base, Product, InventoryItem, Detection
+from app.routers.data import router as data_router, _update_items_from_values
+
+EARLIER = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions on a dedicated, throwaway SQLite database"""
+    engine = create_engine(f"sqlite:///{tmp_path}/test.db")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(session_factory):
+    """Test client for the data router, with get_db bound to the test database"""
+    db = session_factory()
+    product = Product(sku="SKU-1", name="Ball", category="Sports")
+    db.add(product)
+    db.flush()
+    db.add_all([
+        InventoryItem(rfid_tag="T1", product_id=product.id, status="not present"),
+        InventoryItem(rfid_tag="T2", product_id=product.id, status="present"),
+        InventoryItem(rfid_tag="T3", product_id=product.id, status="present", last_seen_at=EARLIER),
+        InventoryItem(rfid_tag="T4", product_id=product.id, status="present", last_seen_at=EARLIER)
+    ])
+    db.commit()
+    db.close()
+    
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    app = FastAPI()
+    app.include_router(data_router)
+    app.dependency_overrides[get_db] = get_test_db
+    return TestClient(app)
+
+
+def load_items(session_factory):
+    """Current inventory items keyed by RFID tag"""
+    db = session_factory()
+    try:
+        return {item.rfid_tag: item for item in db.query(InventoryItem)}
+    finally:
+        db.close()
+
+
+def detection(tag, status="present", x=None, y=None):
+    """One /data/bulk detection"""
+    return {"product_id": tag, "product_name": "Ball", "status": status, "x_position": x, "y_position": y}
+
+
+@pytest.mark.unit
+class TestBulkDetections:
+    """Unit tests for POST /data/bulk item updates"""
+    
+    def post(self, client, detections):
+        response = client.post("/data/bulk", json={"detections": detections})
+        assert response.status_code == 200, response.text
+        return response.json()
+    
+    def test_last_detection_of_a_tag_wins(self, client, session_factory):
+        """Repeated tags in one batch leave the item in the state of the last one"""
+        result = self.post(client, [
+            detection("T1", "present", 1.0, 1.0),
+            detection("T1", "missing", 2.0, 2.0),
+            detection("T1", "present", 3.0, 4.0),
+            detection("T2", "present", 5.0, 5.0),
+            detection("T2", "missing", 6.0, 6.0)
+        ])
+        items = load_items(session_factory)
+        
+        assert result == {"status": "success", "processed": 5}
+        assert (items["T1"].status, items["T1"].x_position, items["T1"].y_position) == ("present", 3.0, 4.0)
+        assert (items["T2"].status, items["T2"].x_position) == ("not present", 6.0)
+    
+    def test_present_detection_sets_last_seen(self, client, session_factory):
+        """A present detection stamps last_seen_at, also when a later one is missing"""
+        self.post(client, [
+            detection("T1", "present", 1.0, 1.0),
+            detection("T2", "present", 1.0, 1.0),
+            detection("T2", "missing", 2.0, 2.0)
+        ])
+        items = load_items(session_factory)
+        
+        assert items["T1"].last_seen_at is not None
+        assert items["T2"].last_seen_at is not None
+        assert items["T2"].last_seen_at == items["T1"].last_seen_at
+    
+    def test_non_present_detection_keeps_last_seen(self, client, session_factory):
+        """Missing detections keep the stored last_seen_at (NULL stays NULL)"""
+        self.post(client, [
+            detection("T1", "missing"),
+            detection("T3", "missing", 7.0, 8.0),
+            detection("T4", "missing"),
+            detection("T4", "missing")
+        ])
+        items = load_items(session_factory)
+        
+        assert items["T1"].last_seen_at is None
+        assert items["T1"].status == "not present"
+        assert items["T3"].last_seen_at == EARLIER
+        assert (items["T3"].status, items["T3"].x_position) == ("not present", 7.0)
+        assert items["T4"].last_seen_at == EARLIER
+    
+    def test_unknown_tags_are_logged_only(self, client, session_factory):
+        """Unknown tags are stored as detections and update no inventory item"""
+        self.post(client, [detection("UNKNOWN", "present", 1.0, 1.0), detection("T1", "present")])
+        
+        db = session_factory()
+        try:
+            assert db.query(Detection).count() == 2
+            assert db.query(InventoryItem).count() == 4
+        finally:
+            db.close()
+
+
+class RecordingSession:
+    """Minimal stand-in Session: reports a dialect and records executed statements"""
+    
+    def __init__(self, dialect_name):
+        self.dialect = type("Dialect", (), {"name": dialect_name})()
+        self.statements = []
+    
+    def get_bind(self):
+        return self
+    
+    def execute(self, statement, *args):
+        self.statements.append(statement)
+
+
+@pytest.mark.unit
+class TestPostgresItemUpdate:
+    """Unit tests for the UPDATE ... FROM (VALUES ...) statement used on PostgreSQL"""
+    
+    def compile_update(self, item_updates):
+        db = RecordingSession("postgresql")
+        _update_items_from_values(db, item_updates)
+        assert len(db.statements) == 1
+        return str(db.statements[0].compile(dialect=postgresql.dialect()))
+    
+    def test_all_null_columns_are_cast(self):
+        """A chunk of position-less missing detections still types its NULL columns"""
+        sql = self.compile_update({"T1": ("not present", None, None, None)})
+        
+        assert "FROM (VALUES" in sql
+        assert "x_position=CAST(v.x_position AS FLOAT)" in sql
+        assert "y_position=CAST(v.y_position AS FLOAT)" in sql
+        assert "coalesce(CAST(v.last_seen_at AS TIMESTAMP WITHOUT TIME ZONE), inventory_items.last_seen_at)" in sql
+    
+    def test_empty_updates_execute_nothing(self):
+        """No updates means no statement"""
+        db = RecordingSession("postgresql")
+        _update_items_from_values(db, {})
+        
+        assert db.statements == []
+
+
+@pytest.mark.unit
+class TestRequestBodyDocs:
+    """Unit tests for the OpenAPI request bodies of the raw-body ingestion routes"""
+    
+    @pytest.mark.parametrize("path, field", [
+        ("/data", "detections"),
+        ("/data/bulk", "detections"),
+        ("/uwb/bulk", "measurements")
+    ])
+    def test_request_body_is_documented(self, path, field):
+        """Bodies read through _json_body still show up, with nested models inlined"""
+        app = FastAPI()
+        app.include_router(data_router)
+        body = app.openapi()["paths"][path]["post"]["requestBody"]
+        schema = body["content"]["application/json"]["schema"]
+        
+        assert body["required"] is True
+        assert "properties" in schema["properties"][field]["items"]
+        assert "$ref" not in str(schema)
@@ -9,6 +9,7 @@ Or: pytest -m unit
 
 import pytest
 import sys
+import numpy as np
 from pathlib import Path
 
 # Add backend to path
@@ -151,6 +152,23 @@ class TestTriangulationService:
         # Position should be within store bounds (with some tolerance)
         assert -200 <= x <= 1200
         assert -200 <= y <= 1000
+    
+    def test_array_input_matches_tuple_input(self):
+        """Array (SoA) input should give the same result as the tuple list"""
+        measurements = [
+            (0, 0, 640),
+            (1000, 0, 640),
+            (1000, 800, 640),
+            (0, 800, 640),
+        ]
+        anchor_xy = np.array([(m[0], m[1]) for m in measurements])
+        distances = np.array([m[2] for m in measurements])
+        
+        from_tuples = self.service.calculate_position(measurements)
+        from_arrays = self.service.calculate_position_arrays(anchor_xy, distances)
+        
+        assert from_arrays == pytest.approx(from_tuples)
+        assert self.service.calculate_position_arrays(anchor_xy[:1], distances[:1]) is None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Unit tests for WebSocket broadcast batching
+Tests ConnectionManager._merge_batch without clients or an event loop
+
+Run with: pytest tests/unit/test_websocket_manager.py -v
+Or: pytest -m unit
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.websocket_manager import ConnectionManager
+
+
+def missing_update(added=(), removed=()):
+    """Build a missing_update message like broadcast_missing_update()"""
+    return {
+        "type": "missing_update",
+        "data": {
+            "added": [{"rfid_tag": tag, "x_position": x} for tag, x in added],
+            "removed": list(removed)
+        }
+    }
+
+
+@pytest.mark.unit
+class TestMergeBatch:
+    """Unit tests for merging queued messages within one batch window"""
+    
+    def merged_missing(self, batch):
+        """The single folded missing_update of a merged batch"""
+        messages = [m for m in ConnectionManager._merge_batch(batch) if m["type"] == "missing_update"]
+        assert len(messages) == 1
+        return messages[0]["data"]
+    
+    def test_add_remove_add_same_tag(self):
+        """The last add wins: the tag ends up added (latest data), not removed"""
+        data = self.merged_missing([
+            missing_update(added=[("T1", 1.0)]),
+            missing_update(removed=["T1"]),
+            missing_update(added=[("T1", 2.0)])
+        ])
+        
+        assert data["added"] == [{"rfid_tag": "T1", "x_position": 2.0}]
+        assert data["removed"] == []
+    
+    def test_remove_add_remove_same_tag(self):
+        """The last remove wins: the tag ends up removed only"""
+        data = self.merged_missing([
+            missing_update(removed=["T1"]),
+            missing_update(added=[("T1", 1.0)]),
+            missing_update(removed=["T1"])
+        ])
+        
+        assert data["added"] == []
+        assert data["removed"] == ["T1"]
+    
+    def test_independent_tags_are_kept(self):
+        """Deltas for different tags are folded together without interfering"""
+        data = self.merged_missing([
+            missing_update(added=[("T1", 1.0)], removed=["T2"]),
+            missing_update(added=[("T3", 3.0)]),
+            missing_update(removed=["T1"])
+        ])
+        
+        assert data["added"] == [{"rfid_tag": "T3", "x_position": 3.0}]
+        assert sorted(data["removed"]) == ["T1", "T2"]
+    
+    def test_other_types_merge_alongside(self):
+        """Position updates keep only the latest; item updates are concatenated"""
+        merged = ConnectionManager._merge_batch([
+            {"type": "position_update", "data": {"x": 1}},
+            missing_update(added=[("T1", 1.0)]),
+            {"type": "item_update", "data": {"items": [{"rfid_tag": "A"}], "count": 1}},
+            {"type": "position_update", "data": {"x": 2}},
+            {"type": "item_update", "data": {"items": [{"rfid_tag": "B"}], "count": 1}}
+        ])
+        by_type = {m["type"]: m for m in merged}
+        
+        assert len(merged) == 3
+        assert by_type["position_update"]["data"] == {"x": 2}
+        assert by_type["item_update"]["data"] == {"items": [{"rfid_tag": "A"}, {"rfid_tag": "B"}], "count": 2}
+        assert by_type["missing_update"]["data"]["added"] == [{"rfid_tag": "T1", "x_position": 1.0}]